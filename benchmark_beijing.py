@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Offline BSE collector benchmark
+Runs collect_all_companies against the local bseinfo.net stub and reports
+throughput, request latency and peak memory
+"""
+import sys
+import os
+import io
+import time
+import json
+import socket
+import tempfile
+import threading
+import subprocess
+import tracemalloc
+from contextlib import redirect_stdout
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scrapers'))
+
+STUB_SCRIPT = os.path.join(os.path.dirname(__file__), 'scrapers', 'beijing', 'bse_stub.py')
+
+
+class LatencyRecorder:
+    """Wraps a rate limiter and keeps the latency of every request it is told about."""
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self.latencies = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        self.limiter.acquire()
+
+    def record(self, latency, ok=True):
+        with self._lock:
+            self.latencies.append(latency)
+            if not ok:
+                self.errors += 1
+        self.limiter.record(latency, ok)
+
+    def __getattr__(self, name):
+        return getattr(self.limiter, name)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def start_stub(args):
+    """Run the stub in its own process so it does not count toward peak memory."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+
+    cmd = [sys.executable, STUB_SCRIPT, '--port', str(port),
+           '--latency', str(args.latency), '--jitter', str(args.jitter),
+           '--error-rate', str(args.error_rate), '--empty-ratio', str(args.empty_ratio)]
+    if args.fixture:
+        cmd.extend(['--fixture', args.fixture])
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    proc.stdout.readline()  # "serving on ..." once the socket is bound
+    return proc, f"http://127.0.0.1:{port}"
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the BSE collector against a local stub')
+    parser.add_argument('--codes', type=int, default=300, help='Number of 920xxx codes to fetch (default: 300)')
+    parser.add_argument('--workers', type=int, default=8, help='Requests in flight (default: 8)')
+    parser.add_argument('--rps', type=float, default=0, help='Requests-per-second cap, 0 for none (default: 0)')
+    parser.add_argument('--adaptive', action='store_true', help='Use AIMD rate control starting at --rps')
+    parser.add_argument('--max-rps', type=float, default=10.0, help='Upper bound for --adaptive (default: 10.0)')
+    parser.add_argument('--bundle', action='store_true', help='Fetch the multi-endpoint company bundle')
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub seconds per response (default: 0.05)')
+    parser.add_argument('--jitter', type=float, default=0.02, help='Stub extra random seconds (default: 0.02)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Stub share of HTTP 503 answers (default: 0)')
+    parser.add_argument('--empty-ratio', type=float, default=0.3, help='Stub share of empty codes (default: 0.3)')
+    parser.add_argument('--fixture', help='Recorded detailCompany.do response for the stub to serve')
+    parser.add_argument('--url', help='Benchmark an already running stub instead of starting one')
+    parser.add_argument('--verbose', action='store_true', help='Show the collector output')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bse_bench_')
+    # Keep the benchmark's cache and CSVs away from real runs
+    os.environ['STATE_DIR'] = os.path.join(workdir, '.state')
+    from run_beijing import collect_all_companies
+    from beijing.bse_collector import BSE_CODE_RANGE, RateLimiter, AdaptiveRateLimiter
+
+    proc, url = (None, args.url) if args.url else start_stub(args)
+    try:
+        if args.adaptive:
+            limiter = AdaptiveRateLimiter(rate=args.rps or 1.0, max_rate=args.max_rps, log=lambda msg: None)
+        else:
+            limiter = RateLimiter(args.rps)
+        recorder = LatencyRecorder(limiter)
+        codes = [str(code) for code in BSE_CODE_RANGE][:args.codes]
+
+        print(f"🧪 Benchmarking {len(codes)} codes against {url} "
+              f"({args.workers} worker(s), {'bundle' if args.bundle else 'baseinfo'})")
+        tracemalloc.start()
+        started = time.perf_counter()
+        with redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+            collect_all_companies(output_dir=os.path.join(workdir, 'output'), workers=args.workers,
+                                  refresh=True, bundle=args.bundle, codes=codes,
+                                  base_url=url, limiter=recorder)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        with urlopen(f"{url}/__stats", timeout=5) as response:
+            served = json.load(response)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    requests = sum(count for path, count in served.items() if path != '/__stats')
+    print(f"{'=' * 60}")
+    print(f"⏱️  {elapsed:.2f}s, {len(codes) / elapsed:.1f} codes/sec")
+    print(f"📶 Latency p50 {percentile(recorder.latencies, 50) * 1000:.0f} ms, "
+          f"p95 {percentile(recorder.latencies, 95) * 1000:.0f} ms")
+    print(f"🧠 Peak memory {peak / 1024 / 1024:.1f} MiB (tracemalloc)")
+    print(f"🌐 {requests} stub requests ({requests / len(codes):.2f} per code), {recorder.errors} failed codes")
+    print(f"📁 Output in {workdir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
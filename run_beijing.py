@@ -5,76 +5,136 @@ Collects BSE data from https://www.bseinfo.net/nq/listedcompany.html
 """
 import sys
 import os
-import csv
-import time
+import subprocess
+from datetime import datetime
+from itertools import chain
 from pathlib import Path
 
 # Add scrapers directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scrapers'))
 
-from beijing.test_bse_spider import fetch_bse_company, format_date
-
-
-def collect_all_companies(limit=None, output_dir='output'):
-    """Collect all BSE companies and save to CSV"""
-    results = []
-
-    # Create output directory
-    output_path = Path(output_dir)
-    output_path.mkdir(exist_ok=True)
-
-    print(f"🚀 Starting BSE data collection...")
+from beijing.bse_client import BSEClient
+from beijing.bse_collector import (COMPANY_FIELDS, SHAREHOLDER_FIELDS, CAPITAL_FIELDS,
+                                   RateLimiter, AdaptiveRateLimiter, fetch_concurrently,
+                                   company_row, shareholder_rows, capital_row)
+from beijing.bse_universe import load_bse_codes
+from beijing.bse_cache import BSECache, DEFAULT_CACHE_DIR, DEFAULT_HIT_TTL, DEFAULT_MISS_TTL
+from beijing.bse_output import ResumableCSVWriter
+
+# Extra CSVs written by --bundle, next to beijing_companies_<timestamp>.csv
+BUNDLE_TABLES = {
+    'beijing_shareholders': SHAREHOLDER_FIELDS,
+    'beijing_capital_structure': CAPITAL_FIELDS,
+}
+
+
+def collect_all_companies(limit=None, output_dir='output', workers=1, rate=1.0, seed='universe',
+                          refresh=False, hit_ttl=DEFAULT_HIT_TTL, miss_ttl=DEFAULT_MISS_TTL,
+                          resume=False, adaptive=False, max_rate=10.0, bundle=False,
+                          codes=None, base_url=BSEClient.BASE_URL, limiter=None):
+    """
+    Collect all BSE companies, streaming rows to CSV as they arrive.
+    With bundle=True every company's endpoints are fetched concurrently and
+    shareholder and capital-structure CSVs are written alongside.
+    `codes`, `base_url` and `limiter` override the code source, the site and
+    the rate control (used by benchmark_beijing.py against the local stub).
+    """
+    mode = f"adaptive from {rate or 1.0} up to {max_rate}" if adaptive else (rate or 'unlimited')
+    print(f"🚀 Starting BSE data collection ({workers} worker(s), {mode} req/s)...")
     print(f"{'=' * 60}")
 
-    for code in range(920001, 920993):
-        stock_code = str(code)
-
-        print(f"\rProcessing {stock_code}...", end="", flush=True)
-
-        try:
-            baseinfo = fetch_bse_company(stock_code, verbose=False)
-
+    tables = BUNDLE_TABLES if bundle else None
+    with ResumableCSVWriter(output_dir, COMPANY_FIELDS, 'issuer_code', resume=resume, tables=tables) as output:
+        if output.resumed:
+            print(f"♻️  Resuming {output.filename}: {len(output.done)} codes done, {output.rows} rows")
+        elif resume:
+            print("ℹ️  No interrupted run to resume, starting a new one")
+
+        if codes is None:
+            codes, source = load_bse_codes(seed)
+        else:
+            source = "caller"
+        codes = [code for code in codes if code not in output.done]
+        print(f"📋 {len(codes)} codes to fetch (source: {source})")
+
+        # Codes fetched within their TTL (company or empty) skip the network
+        cache_dir = f"{DEFAULT_CACHE_DIR}_bundle" if bundle else DEFAULT_CACHE_DIR
+        cache = BSECache(cache_dir, hit_ttl=hit_ttl, miss_ttl=miss_ttl)
+        if refresh:
+            cached, to_fetch = {}, codes
+        else:
+            cached, to_fetch = cache.partition(codes)
+        print(f"🗄️  {len(cached)} served from cache, {len(to_fetch)} to fetch")
+
+        # One shared session: a single cookie fetch, then one request (or one
+        # concurrent bundle of requests) per company
+        client = BSEClient(base_url)
+        if limiter is None:
+            if adaptive:
+                limiter = AdaptiveRateLimiter(rate=rate or 1.0, max_rate=max_rate)
+            else:
+                limiter = RateLimiter(rate)
+        client.on_rejected = getattr(limiter, 'backoff', None)
+        fetch = client.fetch_bundle if bundle else client.fetch_company
+        fetched = fetch_concurrently(to_fetch, cache.wrap(fetch), workers=workers, limiter=limiter)
+        from_cache = ((code, result, None) for code, result in cached.items())
+
+        for stock_code, result, error in chain(from_cache, fetched):
+            print(f"\rProcessing {stock_code}...", end="", flush=True)
+
+            if error:
+                output.fail(stock_code)
+                print(f"\r❌ {stock_code}: Error - {error}")
+                continue
+
+            baseinfo = result['baseinfo'] if bundle and result else result
             if baseinfo and baseinfo.get('stockCode'):
-                results.append({
-                    'issuer_code': baseinfo.get('stockCode'),
-                    'company_name_ch': baseinfo.get('name'),
-                    'company_name_en': None,
-                    'industry_csic': baseinfo.get('industry'),
-                    'registered_capital': baseinfo.get('totalStockEquity'),
-                    'established_date': format_date(baseinfo.get('publishingDate')),
-                    'registered_address': baseinfo.get('area'),
-                    'disclosure_lang': 'cn',
-                    'isin': baseinfo.get('ISIN'),
-                    'listing_date': format_date(baseinfo.get('listingDate')),
-                    'broker': baseinfo.get('broker'),
-                    'snapshot_date': time.strftime('%Y-%m-%d')
-                })
+                extra = None
+                if bundle:
+                    extra = {'beijing_shareholders': shareholder_rows(result),
+                             'beijing_capital_structure': [capital_row(result)]}
+                output.write(stock_code, company_row(baseinfo), extra)
                 print(f"\r✅ {stock_code}: {baseinfo.get('name', 'Unknown')[:40]}")
 
-            time.sleep(1)  # Be polite
+                if limit and output.rows >= limit:
+                    break
+            else:
+                output.write(stock_code)
 
-            if limit and len(results) >= limit:
-                break
+    print(f"\n{'=' * 60}")
+    print(f"✅ Collected {output.rows} companies")
+    if output.failed:
+        print(f"⚠️  {output.failed} codes failed, rerun with --resume to retry them")
 
-        except Exception as e:
-            print(f"\r❌ {stock_code}: Error - {e}")
-            continue
+    if output.rows:
+        print(f"💾 Saved to: {output.filename}")
+        for path, _, _ in output.tables.values():
+            print(f"💾 Saved to: {path}")
+        return str(output.filename)
+
+    return None
 
-    print(f"\n{'=' * 60}")
-    print(f"✅ Collected {len(results)} companies")
 
-    # Save to CSV
-    if results:
-        filename = output_path / f"beijing_companies_{time.strftime('%Y%m%d_%H%M%S')}.csv"
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=results[0].keys())
-            writer.writeheader()
-            writer.writerows(results)
+def run_scrapy_spider(limit=None, output_dir='output', seed='universe'):
+    """Run the bse_companies Scrapy spider through the shared CNINFO pipelines"""
+    output_path = Path(output_dir)
+    output_path.mkdir(exist_ok=True)
 
-        print(f"💾 Saved to: {filename}")
-        return str(filename)
+    env = os.environ.copy()
+    env['SCRAPY_PROJECT'] = 'cninfo'
+    env['OUTPUT_DIR'] = str(output_path)
 
-    return None
+    cmd = [
+        'scrapy', 'crawl', 'bse_companies',
+        '-a', f'seed={seed}',
+        '-L', 'INFO',
+        '--logfile', str(output_path / f'bse_companies_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
+    ]
+    if limit:
+        cmd.extend(['-a', f'limit={limit}'])
+
+    print(f"🚀 Running Scrapy spider: bse_companies")
+    return subprocess.run(cmd, env=env).returncode
 
 
 def main():
@@ -89,19 +149,59 @@ Examples:
   python run_beijing.py                    # Scrape all BSE companies
   python run_beijing.py --limit 10         # Scrape first 10 companies
   python run_beijing.py --output mydata    # Save to custom directory
+  python run_beijing.py --workers 8 --rps 4   # 8 requests in flight, at most 4 req/s
+  python run_beijing.py --seed range       # Probe every 920001-920992 code
+  python run_beijing.py --refresh          # Ignore cached results and re-fetch every code
+  python run_beijing.py --resume           # Continue the last interrupted run
+  python run_beijing.py --workers 8 --adaptive   # Let the rate follow server health
+  python run_beijing.py --bundle --workers 4   # Also shareholders + capital structure CSVs
+  python run_beijing.py --engine scrapy    # Scrapy spider + CNINFO pipelines (snapshot export)
         '''
     )
 
     parser.add_argument('--limit', type=int, help='Limit number of companies to scrape')
     parser.add_argument('--output', default='output', help='Output directory (default: output)')
+    parser.add_argument('--engine', choices=['urllib', 'scrapy'], default='urllib',
+                        help='urllib collector (CSV in --output) or the bse_companies Scrapy spider '
+                             '(SNAPSHOT_DIR/<date>/bse_companies.csv) (default: urllib)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of requests in flight at once (default: 1)')
+    parser.add_argument('--rps', type=float, default=1.0,
+                        help='Global requests-per-second cap, 0 for no cap (default: 1.0)')
+    parser.add_argument('--seed', choices=['universe', 'range'], default='universe',
+                        help='Where the code list comes from: CNINFO universe with range '
+                             'fallback, or blind range probing (default: universe)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Re-fetch every code even if a fresh cached result exists')
+    parser.add_argument('--hit-ttl', type=float, default=DEFAULT_HIT_TTL / 3600,
+                        help='Hours a cached company stays fresh (default: 24)')
+    parser.add_argument('--miss-ttl', type=float, default=DEFAULT_MISS_TTL / 3600,
+                        help='Hours a cached empty code stays fresh (default: 168)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='AIMD rate control: start at --rps, speed up while the site is '
+                             'healthy, halve on errors, redirects or latency spikes')
+    parser.add_argument('--max-rps', type=float, default=10.0,
+                        help='Upper bound for --adaptive (default: 10.0)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue the most recent interrupted run in the output directory')
+    parser.add_argument('--bundle', action='store_true',
+                        help='Fetch every company endpoint at once and also write shareholder and '
+                             'capital-structure CSVs (counts as one request per company for --rps)')
 
     args = parser.parse_args()
 
     try:
-        collect_all_companies(limit=args.limit, output_dir=args.output)
+        if args.engine == 'scrapy':
+            return run_scrapy_spider(limit=args.limit, output_dir=args.output, seed=args.seed)
+
+        collect_all_companies(limit=args.limit, output_dir=args.output,
+                              workers=args.workers, rate=args.rps, seed=args.seed,
+                              refresh=args.refresh, hit_ttl=args.hit_ttl * 3600,
+                              miss_ttl=args.miss_ttl * 3600, resume=args.resume,
+                              adaptive=args.adaptive, max_rate=args.max_rps, bundle=args.bundle)
         return 0
     except KeyboardInterrupt:
-        print("\n\n⚠️  Interrupted by user")
+        print("\n\n⚠️  Interrupted by user (progress saved, rerun with --resume)")
         return 130
     except Exception as e:
         print(f"\n❌ Error: {e}")
@@ -13,7 +13,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scrapers'))
 
 
-def run_spider(spider_name, output_dir='output'):
+def run_spider(spider_name, output_dir='output', refresh_universe=False):
     """Run a specific CNINFO spider"""
     print(f"\n{'=' * 60}")
     print(f"🚀 Running CNINFO spider: {spider_name}")
@@ -34,6 +34,8 @@ def run_spider(spider_name, output_dir='output'):
         '-L', 'INFO',
         '--logfile', str(output_path / f'{spider_name}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
     ]
+    if refresh_universe:
+        cmd.extend(['-s', 'UNIVERSE_REFRESH=1'])
 
     try:
         result = subprocess.run(cmd, env=env, check=True)
@@ -44,19 +46,109 @@ def run_spider(spider_name, output_dir='output'):
         return e.returncode
 
 
-def run_all_spiders(output_dir='output'):
-    """Run all CNINFO spiders"""
-    spiders = [
-        'cninfo_universe',
-        'cninfo_securities',
-        'cninfo_enrichment',
-        'cninfo_company_details'
-    ]
+def run_in_process(spider_names, output_dir='output', refresh_universe=False, budget=None):
+    """
+    Run several CNINFO spiders concurrently in one CrawlerProcess. They split
+    one CONCURRENT_REQUESTS budget and share the snapshot CSV handles, so the
+    output matches separate runs while the reactor is never idle. The first
+    spider fetches the universe; the others start once its snapshot cache is
+    written and reuse it.
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(exist_ok=True)
+    os.environ['SCRAPY_PROJECT'] = 'cninfo'
+    os.environ['OUTPUT_DIR'] = str(output_path)
+
+    from scrapy.crawler import Crawler, CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+    from scrapers.cninfo.utils.universe import universe_cache_path
+
+    settings = get_project_settings()
+    settings.set('LOG_LEVEL', 'INFO')
+    settings.set('LOG_FILE', str(output_path / f'cninfo_in_process_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'))
+    if refresh_universe:
+        settings.set('UNIVERSE_REFRESH', True)
+
+    budget = budget or settings.getint('CONCURRENT_REQUESTS')
+    share = max(1, budget // len(spider_names))
+    print(f"\n{'=' * 60}")
+    print(f"🚀 Running {len(spider_names)} CNINFO spiders in one process "
+          f"({budget} concurrent requests, {share} each)")
+    print(f"{'=' * 60}\n")
+
+    process = CrawlerProcess(settings)
+    crawlers = []
+    for name in spider_names:
+        crawler_settings = settings.copy()
+        crawler_settings.set('CONCURRENT_REQUESTS', share, priority='cmdline')
+        crawler_settings.set('CONCURRENT_REQUESTS_PER_DOMAIN', share, priority='cmdline')
+        if crawlers:
+            # Only the first spider may refresh the universe
+            crawler_settings.set('UNIVERSE_REFRESH', False, priority='cmdline')
+        crawlers.append(Crawler(process.spider_loader.load(name), crawler_settings))
+
+    # Install the configured (asyncio) reactor before twisted picks its default
+    from scrapy.utils.reactor import install_reactor
+    install_reactor(settings.get('TWISTED_REACTOR'))
+    from twisted.internet import defer, reactor, task
+
+    universe = universe_cache_path(settings, 'cn')
+    cold = refresh_universe or not universe.exists()
+
+    @defer.inlineCallbacks
+    def crawl_all():
+        first = process.crawl(crawlers[0])
+        if cold and len(crawlers) > 1:
+            while not first.called and (not universe.exists() or refresh_pending()):
+                yield task.deferLater(reactor, 0.5, lambda: None)
+        for crawler in crawlers[1:]:
+            process.crawl(crawler)
+        yield process.join()
+        if reactor.running:
+            reactor.stop()
+
+    started = datetime.now().timestamp()
+
+    def refresh_pending():
+        # With --refresh-universe an existing file only counts once rewritten
+        return refresh_universe and universe.stat().st_mtime < started
+
+    reactor.callWhenRunning(crawl_all)
+    process.start(stop_after_crawl=False)
 
     results = {}
+    for name, crawler in zip(spider_names, crawlers):
+        reason = crawler.stats.get_value('finish_reason') if crawler.stats else None
+        results[name] = 0 if reason == 'finished' else 1
+    return results
+
+
+def run_all_spiders(output_dir='output', refresh_universe=False, separate=False,
+                    in_process=False, budget=None):
+    """
+    Run all CNINFO outputs. By default one cninfo_planned crawl fetches every
+    URL once and feeds all extractors; separate=True runs the four spiders
+    one after another as before, or side by side with in_process=True.
+    """
+    if separate:
+        spiders = [
+            'cninfo_universe',
+            'cninfo_securities',
+            'cninfo_enrichment',
+            'cninfo_company_details'
+        ]
+    else:
+        spiders = ['cninfo_planned']
+
+    results = {}
+
+    if in_process:
+        results = run_in_process(spiders, output_dir, refresh_universe, budget)
 
-    for spider in spiders:
-        results[spider] = run_spider(spider, output_dir)
+    for spider in ([] if in_process else spiders):
+        # The first spider refreshes the snapshot's universe cache, the rest reuse it
+        results[spider] = run_spider(spider, output_dir, refresh_universe)
+        refresh_universe = False
 
     # Print summary
     print(f"\n{'=' * 60}")
@@ -85,24 +177,39 @@ Available spiders:
   cninfo_securities       - Gather security-level information
   cninfo_enrichment       - Collect company details and shareholders
   cninfo_company_details  - Retrieve detailed company profiles
+  cninfo_planned          - All of the above in one crawl, each URL fetched once
 
 Examples:
-  python run_cninfo.py                           # Run all spiders
+  python run_cninfo.py                           # All outputs via cninfo_planned
+  python run_cninfo.py --separate                # Run the four spiders one by one
+  python run_cninfo.py --separate --in-process   # ... or all four at once in one process
   python run_cninfo.py --spider cninfo_universe  # Run specific spider
   python run_cninfo.py --output mydata           # Save to custom directory
+  python run_cninfo.py --refresh-universe        # Re-download the yellowpages universe
         '''
     )
 
     parser.add_argument('--spider', help='Specific spider to run (default: run all)')
     parser.add_argument('--output', default='output', help='Output directory (default: output)')
+    parser.add_argument('--separate', action='store_true',
+                        help='Run the four spiders separately instead of one planned crawl')
+    parser.add_argument('--in-process', action='store_true',
+                        help='Run the spiders concurrently in one Scrapy process')
+    parser.add_argument('--budget', type=int,
+                        help='Concurrent requests shared by --in-process spiders '
+                             '(default: CONCURRENT_REQUESTS setting)')
+    parser.add_argument('--refresh-universe', action='store_true',
+                        help='Re-download the yellowpages universe instead of reusing this '
+                             "snapshot's cached copy")
 
     args = parser.parse_args()
 
     try:
         if args.spider:
-            return run_spider(args.spider, args.output)
+            return run_spider(args.spider, args.output, args.refresh_universe)
         else:
-            return run_all_spiders(args.output)
+            return run_all_spiders(args.output, args.refresh_universe, args.separate,
+                                   args.in_process, args.budget)
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrupted by user")
         return 130
@@ -0,0 +1,68 @@
+"""
+On-disk cache of BSE detailCompany.do results
+One JSON file per stock code, with separate TTLs for companies and empty codes
+"""
+import os
+import json
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("STATE_DIR", ".state"), "bse_cache")
+DEFAULT_HIT_TTL = 24 * 3600         # a listed company's baseinfo: 1 day
+DEFAULT_MISS_TTL = 7 * 24 * 3600    # "no company at this code": 1 week
+
+
+class BSECache:
+    """
+    Caches baseinfo per stock code. A stored None is a negative entry: the
+    code had no company when it was fetched and is trusted for `miss_ttl`.
+    """
+
+    def __init__(self, base_dir=DEFAULT_CACHE_DIR, hit_ttl=DEFAULT_HIT_TTL, miss_ttl=DEFAULT_MISS_TTL):
+        self.base_dir = base_dir
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def _path(self, code):
+        return os.path.join(self.base_dir, f"{code}.json")
+
+    def get(self, code):
+        """Return (fresh, baseinfo); fresh is False when the entry is absent or expired."""
+        try:
+            with open(self._path(code), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return False, None
+
+        baseinfo = entry.get("baseinfo")
+        ttl = self.hit_ttl if baseinfo else self.miss_ttl
+        if time.time() - entry.get("_ts", 0) > ttl:
+            return False, None
+        return True, baseinfo
+
+    def put(self, code, baseinfo):
+        # Write-then-rename so a crash never leaves a truncated entry
+        path = self._path(code)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"baseinfo": baseinfo, "_ts": time.time()}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def partition(self, codes):
+        """Split codes into ({code: cached baseinfo}, [codes that need a fetch])."""
+        cached, missing = {}, []
+        for code in codes:
+            fresh, baseinfo = self.get(code)
+            if fresh:
+                cached[code] = baseinfo
+            else:
+                missing.append(code)
+        return cached, missing
+
+    def wrap(self, fetch):
+        """Return fetch(code) that also stores its result; failures are not cached."""
+        def fetch_and_store(code):
+            baseinfo = fetch(code)
+            self.put(code, baseinfo)
+            return baseinfo
+        return fetch_and_store
@@ -0,0 +1,252 @@
+"""
+Long-lived bseinfo.net client
+Keeps one keep-alive connection per worker thread and a shared session cookie
+"""
+import gzip
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from http.cookiejar import CookieJar
+from urllib.parse import urlsplit
+from urllib.request import Request
+
+try:
+    from .test_bse_spider import strip_jsonp
+except ImportError:  # run as a script from scrapers/beijing
+    from test_bse_spider import strip_jsonp
+
+
+USER_AGENT = ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+# Statuses bseinfo.net uses to bounce clients without a valid session
+REJECT_STATUSES = (301, 302, 303, 307, 401, 403, 412)
+
+JSONP_CALLBACK = "jQuery371008590243684555687_1762466533461"
+
+
+class BSERequestError(Exception):
+    """A bseinfo.net request failed or was rejected even with a fresh session."""
+
+
+class BSEClient:
+    """
+    Reusable bseinfo.net session.
+
+    The listedcompany.html landing page is visited once to obtain the session
+    cookie; after that every company costs exactly one detailCompany.do request.
+    The cookie is refreshed only when it expires (or is older than
+    `session_ttl` seconds) or when the site rejects a request.
+    """
+
+    BASE_URL = "https://www.bseinfo.net"
+    LANDING_PATH = "/nq/listedcompany.html"
+    DETAIL_PATH = "/nqhqController/detailCompany.do"
+
+    # XHR payloads of the company detail page, joined into one bundle per company.
+    # 'company' is required; the other sections are best-effort.
+    BUNDLE_ENDPOINTS = {
+        'company': DETAIL_PATH + "?callback={callback}&zqdm={code}&xxfcbj=2",
+        'shareholders': "/nqxxController/getTopTenHolders.do?callback={callback}&zqdm={code}",
+        'capital_structure': "/nqxxController/getGbjg.do?callback={callback}&zqdm={code}",
+    }
+
+    def __init__(self, base_url=BASE_URL, timeout=10, session_ttl=1800, bundle_workers=16):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or 'https'
+        self.host = parts.netloc
+        self.timeout = timeout
+        self.session_ttl = session_ttl
+        self.cookie_jar = CookieJar()
+        # Optional callback(reason) fired when the site bounces a request
+        self.on_rejected = None
+
+        self._local = threading.local()
+        self._session_lock = threading.Lock()
+        self._session_at = None
+        self._session_generation = 0
+
+        self.bundle_workers = bundle_workers
+        self._bundle_pool = None
+        self._bundle_pool_lock = threading.Lock()
+
+    # ---- connections -------------------------------------------------
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn_cls = HTTPSConnection if self.scheme == 'https' else HTTPConnection
+            conn = conn_cls(self.host, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def close(self):
+        """Close the calling thread's connection and stop the bundle pool."""
+        self._drop_connection()
+        if self._bundle_pool is not None:
+            self._bundle_pool.shutdown(wait=False)
+            self._bundle_pool = None
+
+    def get(self, path, headers):
+        """
+        GET `path` over the calling thread's keep-alive connection.
+        Returns (status, text). A connection the server closed while idle is
+        reopened once before giving up.
+        """
+        req = Request(f"{self.scheme}://{self.host}{path}", headers=headers)
+        self.cookie_jar.add_cookie_header(req)
+        send_headers = dict(req.header_items())
+
+        for attempt in (1, 2):
+            conn = self._connection()
+            try:
+                conn.request('GET', path, headers=send_headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (HTTPException, OSError) as e:
+                self._drop_connection()
+                if attempt == 2:
+                    raise BSERequestError(f"{type(e).__name__}: {e}") from e
+
+        self.cookie_jar.extract_cookies(response, req)
+
+        if response.getheader('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        if response.getheader('Connection', '').lower() == 'close':
+            self._drop_connection()
+
+        return response.status, body.decode('utf-8', errors='replace')
+
+    # ---- session -----------------------------------------------------
+
+    def _session_expired(self):
+        if self._session_at is None:
+            return True
+        if time.monotonic() - self._session_at > self.session_ttl:
+            return True
+        self.cookie_jar.clear_expired_cookies()
+        return len(self.cookie_jar) == 0
+
+    def refresh_session(self, seen_generation=None):
+        """
+        Fetch a new session cookie from the landing page. When several workers
+        hit a rejection at once only the first refreshes; the rest reuse it.
+        """
+        with self._session_lock:
+            if seen_generation is not None and seen_generation != self._session_generation:
+                return
+            self.cookie_jar.clear()
+            headers = {
+                'User-Agent': USER_AGENT,
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+                'Accept-Encoding': 'gzip',
+                'Upgrade-Insecure-Requests': '1',
+            }
+            try:
+                self.get(self.LANDING_PATH, headers)
+            except BSERequestError:
+                pass  # detail requests sometimes succeed without the cookie
+            self._session_at = time.monotonic()
+            self._session_generation += 1
+
+    def ensure_session(self):
+        if self._session_expired():
+            self.refresh_session(self._session_generation)
+
+    # ---- endpoints ---------------------------------------------------
+
+    def fetch_json(self, path):
+        """GET a JSONP endpoint with the session cookie; re-login once on rejection."""
+        headers = {
+            'User-Agent': USER_AGENT,
+            'Accept': 'application/json, text/javascript, */*; q=0.01',
+            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+            'Accept-Encoding': 'gzip',
+            'Referer': f"{self.scheme}://{self.host}{self.LANDING_PATH}",
+            'X-Requested-With': 'XMLHttpRequest',
+        }
+
+        for attempt in (1, 2):
+            self.ensure_session()
+            generation = self._session_generation
+            status, text = self.get(path, headers)
+
+            if status in REJECT_STATUSES or text.lstrip().startswith('<'):
+                if self.on_rejected:
+                    self.on_rejected(f"rejected with status {status}")
+                if attempt == 1:
+                    self.refresh_session(generation)
+                    continue
+                raise BSERequestError(f"Rejected with status {status} after session refresh")
+            if status != 200:
+                raise BSERequestError(f"HTTP {status}")
+
+            return strip_jsonp(text)
+
+    def _endpoint_path(self, section, stock_code):
+        path = self.BUNDLE_ENDPOINTS[section].format(callback=JSONP_CALLBACK, code=stock_code)
+        return f"{path}&_={int(time.time() * 1000)}"
+
+    @staticmethod
+    def _baseinfo(data):
+        baseinfo = data.get('baseinfo') if isinstance(data, dict) else None
+        if not isinstance(baseinfo, dict):
+            return None
+        if not baseinfo.get('stockCode') and not baseinfo.get('name'):
+            return None
+        return baseinfo
+
+    def fetch_company(self, stock_code):
+        """
+        Return the detailCompany.do baseinfo block for `stock_code`, or None
+        when no company is listed at that code.
+        """
+        return self._baseinfo(self.fetch_json(self._endpoint_path('company', stock_code)))
+
+    def _pool(self):
+        with self._bundle_pool_lock:
+            if self._bundle_pool is None:
+                # Pool threads keep their own keep-alive connections between companies
+                self._bundle_pool = ThreadPoolExecutor(max_workers=self.bundle_workers)
+            return self._bundle_pool
+
+    def fetch_bundle(self, stock_code):
+        """
+        Fetch every BUNDLE_ENDPOINTS payload for one company at the same time
+        and join them into {'baseinfo': ..., 'company': ..., '<section>': ...}.
+        Wall-clock cost is the slowest endpoint, not the sum. Returns None when
+        no company is listed at the code; a failed secondary section is None.
+        """
+        secondary = {
+            section: self._pool().submit(self.fetch_json, self._endpoint_path(section, stock_code))
+            for section in self.BUNDLE_ENDPOINTS if section != 'company'
+        }
+        try:
+            company = self.fetch_json(self._endpoint_path('company', stock_code))
+        except Exception:
+            for future in secondary.values():
+                future.cancel()
+            raise
+
+        baseinfo = self._baseinfo(company)
+        if baseinfo is None:
+            for future in secondary.values():
+                future.cancel()
+            return None
+
+        bundle = {'baseinfo': baseinfo, 'company': company}
+        for section, future in secondary.items():
+            try:
+                bundle[section] = future.result()
+            except Exception:
+                bundle[section] = None
+        return bundle
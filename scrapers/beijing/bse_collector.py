@@ -0,0 +1,243 @@
+"""
+BSE collection helpers
+Bounded worker pool with a global requests-per-second cap
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+try:
+    from .test_bse_spider import format_date
+except ImportError:  # run as a script from scrapers/beijing
+    from test_bse_spider import format_date
+
+# Every code the BSE (920xxx) board can currently hold
+BSE_CODE_RANGE = range(920001, 920993)
+
+# Column order of beijing_companies_*.csv (see company_row)
+COMPANY_FIELDS = (
+    'issuer_code', 'company_name_ch', 'company_name_en', 'industry_csic',
+    'registered_capital', 'established_date', 'registered_address', 'disclosure_lang',
+    'isin', 'listing_date', 'broker', 'snapshot_date',
+)
+
+# Extra tables written from a company bundle (see BSEClient.fetch_bundle)
+SHAREHOLDER_FIELDS = (
+    'issuer_code', 'rank', 'shareholder_name', 'shares', 'percentage', 'report_date', 'snapshot_date',
+)
+CAPITAL_FIELDS = (
+    'issuer_code', 'total_shares', 'unrestricted_shares', 'restricted_shares', 'change_date', 'snapshot_date',
+)
+
+
+class RateLimiter:
+    """Spaces out acquire() calls so all workers together stay under `rate` req/s."""
+
+    def __init__(self, rate=None):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        if not self.rate:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+
+        if slot > now:
+            time.sleep(slot - now)
+
+    def record(self, latency, ok=True):
+        """Feedback hook for adaptive limiters; a fixed rate ignores it."""
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    AIMD rate control. Every `window` healthy responses the rate grows by
+    `increase` req/s; an error, an anti-bot rejection or a latency spike
+    (more than `spike_factor` times the running average) multiplies it by
+    `decrease`. After a cut, further cuts wait `cooldown` seconds so one burst
+    of failures from requests already in flight only counts once.
+    """
+
+    def __init__(self, rate=1.0, min_rate=0.2, max_rate=10.0, increase=0.5, decrease=0.5,
+                 window=20, spike_factor=3.0, cooldown=5.0, log=print):
+        super().__init__(rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+        self.spike_factor = spike_factor
+        self.cooldown = cooldown
+        self.log = log
+
+        self._healthy = 0
+        self._avg_latency = None
+        self._last_cut = float('-inf')
+
+    def _set_rate(self, rate, reason):
+        rate = min(self.max_rate, max(self.min_rate, rate))
+        if rate != self.rate:
+            self.log(f"\r⚙️  Rate {self.rate:.2f} → {rate:.2f} req/s ({reason})")
+            self.rate = rate
+
+    def backoff(self, reason):
+        """Cut the rate multiplicatively, at most once per cooldown period."""
+        with self._lock:
+            self._healthy = 0
+            now = time.monotonic()
+            if now - self._last_cut < self.cooldown:
+                return
+            self._last_cut = now
+            self._set_rate(self.rate * self.decrease, reason)
+
+    def record(self, latency, ok=True):
+        if not ok:
+            self.backoff("error")
+            return
+
+        with self._lock:
+            avg = self._avg_latency
+            self._avg_latency = latency if avg is None else 0.9 * avg + 0.1 * latency
+        if avg is not None and latency > self.spike_factor * avg:
+            self.backoff(f"latency spike {latency:.2f}s vs {avg:.2f}s avg")
+            return
+
+        with self._lock:
+            self._healthy += 1
+            if self._healthy >= self.window:
+                self._healthy = 0
+                self._set_rate(self.rate + self.increase,
+                               f"{self.window} healthy responses, avg latency {self._avg_latency:.2f}s")
+
+
+def fetch_concurrently(codes, fetch, workers=1, rate=None, limiter=None):
+    """
+    Call fetch(code) for every code with at most `workers` calls in flight
+    and at most `rate` calls started per second across the whole pool.
+    Pass `limiter` instead of `rate` to share or adapt the cap; it is told
+    the latency and outcome of every call.
+
+    Yields (code, result, error) tuples in completion order. Codes are pulled
+    lazily, so breaking out of the loop stops new work after the in-flight
+    calls finish.
+    """
+    limiter = limiter or RateLimiter(rate)
+    codes = iter(codes)
+
+    def task(code):
+        limiter.acquire()
+        started = time.monotonic()
+        try:
+            result = fetch(code)
+        except Exception:
+            limiter.record(time.monotonic() - started, ok=False)
+            raise
+        limiter.record(time.monotonic() - started)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = {}
+
+        def fill():
+            while len(pending) < max(1, workers):
+                code = next(codes, None)
+                if code is None:
+                    return
+                pending[pool.submit(task, code)] = code
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                code = pending.pop(future)
+                error = future.exception()
+                yield code, (None if error else future.result()), error
+            fill()
+
+
+def company_row(baseinfo):
+    """Map a detailCompany.do baseinfo block to a beijing_companies CSV row."""
+    return {
+        'issuer_code': baseinfo.get('stockCode'),
+        'company_name_ch': baseinfo.get('name'),
+        'company_name_en': None,
+        'industry_csic': baseinfo.get('industry'),
+        'registered_capital': baseinfo.get('totalStockEquity'),
+        'established_date': format_date(baseinfo.get('publishingDate')),
+        'registered_address': baseinfo.get('area'),
+        'disclosure_lang': 'cn',
+        'isin': baseinfo.get('ISIN'),
+        'listing_date': format_date(baseinfo.get('listingDate')),
+        'broker': baseinfo.get('broker'),
+        'snapshot_date': time.strftime('%Y-%m-%d')
+    }
+
+
+def _first(record, *keys):
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _records(payload, *keys):
+    """Unwrap the list a bseinfo.net payload carries under one of `keys` (or is)."""
+    if isinstance(payload, list):
+        if len(payload) == 1 and isinstance(payload[0], dict) and any(k in payload[0] for k in keys):
+            payload = payload[0]
+        else:
+            return [r for r in payload if isinstance(r, dict)]
+    if isinstance(payload, dict):
+        for key in keys:
+            if key in payload:
+                return _records(payload[key], *keys)
+        return [payload]
+    return []
+
+
+def shareholder_rows(bundle):
+    """Top-ten shareholder rows of a company bundle."""
+    code = bundle['baseinfo'].get('stockCode')
+    holders = _records(bundle.get('shareholders'), 'data', 'content', 'list', 'topTenHolders')
+    if not holders and isinstance(bundle.get('company'), dict):
+        # detailCompany.do carries the same list on some pages
+        holders = _records(bundle['company'].get('topTenHolders'), 'data', 'content', 'list')
+
+    rows = []
+    for rank, holder in enumerate(holders, 1):
+        name = _first(holder, 'gdmc', 'holderName', 'shareholderName', 'name')
+        if not name:
+            continue
+        rows.append({
+            'issuer_code': code,
+            'rank': _first(holder, 'xh', 'rank', 'num') or rank,
+            'shareholder_name': name,
+            'shares': _first(holder, 'cgsl', 'holdNum', 'holdShares', 'shares'),
+            'percentage': _first(holder, 'cgbl', 'holdRatio', 'ratio', 'percentage'),
+            'report_date': format_date(_first(holder, 'jzrq', 'reportDate', 'endDate', 'date')),
+            'snapshot_date': time.strftime('%Y-%m-%d'),
+        })
+    return rows
+
+
+def capital_row(bundle):
+    """Capital structure row of a company bundle, falling back to baseinfo's total."""
+    baseinfo = bundle['baseinfo']
+    structures = _records(bundle.get('capital_structure'), 'data', 'content', 'list')
+    structure = structures[0] if structures else {}
+
+    return {
+        'issuer_code': baseinfo.get('stockCode'),
+        'total_shares': _first(structure, 'zgb', 'totalShares', 'totalStockEquity')
+                        or baseinfo.get('totalStockEquity'),
+        'unrestricted_shares': _first(structure, 'wxsgs', 'ltgb', 'unlimitedShares', 'circulatingShares'),
+        'restricted_shares': _first(structure, 'xsgs', 'limitedShares', 'restrictedShares'),
+        'change_date': format_date(_first(structure, 'bdrq', 'changeDate', 'date')),
+        'snapshot_date': time.strftime('%Y-%m-%d'),
+    }
@@ -0,0 +1,137 @@
+"""
+Streaming, resumable BSE CSV output
+Rows are written as they arrive; a checkpoint file records every completed code
+"""
+import os
+import csv
+import time
+from pathlib import Path
+
+
+class ResumableCSVWriter:
+    """
+    Appends rows to <prefix>_<timestamp>.csv and the codes they came from to
+    a sibling .checkpoint file, flushing both after every code. The checkpoint
+    is deleted when the run finishes cleanly, so only interrupted runs (or
+    runs with failed codes) can be resumed; a finished run without rows
+    leaves no CSV behind.
+
+    `tables` ({prefix: fieldnames}) adds sibling CSVs sharing the timestamp,
+    e.g. beijing_shareholders_<timestamp>.csv, keyed by the same `key_field`.
+    Their rows are written before the main row, and on resume rows of codes
+    that never completed are dropped, so a code is never duplicated.
+    """
+
+    def __init__(self, output_dir, fieldnames, key_field, prefix='beijing_companies', resume=False,
+                 tables=None):
+        self.output_path = Path(output_dir)
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        self.fieldnames = list(fieldnames)
+        self.key_field = key_field
+        self.prefix = prefix
+        self.done = set()
+        self.rows = 0
+        self.failed = 0
+
+        self.filename = self._latest_unfinished() if resume else None
+        self.resumed = self.filename is not None
+        if self.resumed:
+            self._load_progress()
+        else:
+            self.filename = self.output_path / f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}.csv"
+
+        self.checkpoint = self.filename.with_suffix('.checkpoint')
+        self._csv_file = open(self.filename, 'a' if self.resumed else 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._csv_file, fieldnames=self.fieldnames)
+        if not self.resumed:
+            self._writer.writeheader()
+            self._csv_file.flush()
+        self._checkpoint_file = open(self.checkpoint, 'a', encoding='utf-8')
+
+        self.tables = {}
+        for table_prefix, table_fields in (tables or {}).items():
+            path = self.filename.with_name(self.filename.name.replace(prefix, table_prefix, 1))
+            existing = self.resumed and path.exists()
+            if existing:
+                self._drop_unfinished(path)
+            f = open(path, 'a' if existing else 'w', newline='', encoding='utf-8')
+            writer = csv.DictWriter(f, fieldnames=list(table_fields))
+            if not existing:
+                writer.writeheader()
+                f.flush()
+            self.tables[table_prefix] = (path, f, writer)
+
+    def _latest_unfinished(self):
+        checkpoints = sorted(self.output_path.glob(f"{self.prefix}_*.checkpoint"))
+        for checkpoint in reversed(checkpoints):
+            csv_path = checkpoint.with_suffix('.csv')
+            if csv_path.exists():
+                return csv_path
+        return None
+
+    def _load_progress(self):
+        # Drop a row cut off mid-write by the crash
+        with open(self.filename, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+        # A row may have been written before its code reached the checkpoint
+        with open(self.filename, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                self.rows += 1
+                self.done.add(row[self.key_field])
+
+        checkpoint = self.filename.with_suffix('.checkpoint')
+        with open(checkpoint, encoding='utf-8') as f:
+            self.done.update(line.strip() for line in f if line.strip())
+
+    def _drop_unfinished(self, path):
+        with open(path, newline='', encoding='utf-8') as f:
+            lines = f.readlines()
+        if lines and not lines[-1].endswith('\n'):
+            lines.pop()
+        kept = lines[:1] + [line for line, row in zip(lines[1:], csv.DictReader(lines))
+                            if row.get(self.key_field) in self.done]
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            f.writelines(kept)
+
+    def write(self, code, row=None, extra=None):
+        """
+        Record `code` as completed, writing `row` first when there is one and
+        `extra` ({table prefix: [rows]}) before that.
+        """
+        for table_prefix, rows in (extra or {}).items():
+            _, f, writer = self.tables[table_prefix]
+            writer.writerows(rows)
+            f.flush()
+        if row is not None:
+            self._writer.writerow(row)
+            self._csv_file.flush()
+            self.rows += 1
+        self._checkpoint_file.write(f"{code}\n")
+        self._checkpoint_file.flush()
+        self.done.add(code)
+
+    def fail(self, code):
+        """Leave `code` out of the checkpoint so a resumed run retries it."""
+        self.failed += 1
+
+    def close(self, finished=False):
+        self._csv_file.close()
+        self._checkpoint_file.close()
+        for _, f, _ in self.tables.values():
+            f.close()
+        if finished:
+            os.remove(self.checkpoint)
+            if self.rows == 0:
+                os.remove(self.filename)
+                for path, _, _ in self.tables.values():
+                    os.remove(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(finished=exc_type is None and not self.failed)
+        return False
@@ -3,49 +3,37 @@
 import sys
 import csv
 import time
-from test_bse_spider import fetch_bse_company, format_date
+from bse_client import BSEClient
+from bse_collector import BSE_CODE_RANGE, fetch_concurrently, company_row
 
 
-def collect_all_companies(limit=None):
+def collect_all_companies(limit=None, workers=1, rate=1.0):
     """Collect all BSE companies and save to CSV"""
     results = []
 
     print(f"🚀 Starting BSE data collection...")
     print(f"{'=' * 60}")
 
-    for code in range(920001, 920993):
-        stock_code = str(code)
+    # One shared session: a single cookie fetch, then one request per company
+    client = BSEClient()
+    codes = (str(code) for code in BSE_CODE_RANGE)
 
+    for stock_code, baseinfo, error in fetch_concurrently(codes, client.fetch_company,
+                                                          workers=workers, rate=rate):
         print(f"\rProcessing {stock_code}...", end="", flush=True)
 
-        try:
-            baseinfo = fetch_bse_company(stock_code, verbose=False)
-
-            if baseinfo and baseinfo.get('stockCode'):
-                results.append({
-                    'issuer_code': baseinfo.get('stockCode'),
-                    'company_name_ch': baseinfo.get('name'),
-                    'company_name_en': None,
-                    'industry_csic': baseinfo.get('industry'),
-                    'registered_capital': baseinfo.get('totalStockEquity'),
-                    'established_date': format_date(baseinfo.get('publishingDate')),
-                    'registered_address': baseinfo.get('area'),
-                    'disclosure_lang': 'cn',
-                    'isin': baseinfo.get('ISIN'),
-                    'listing_date': format_date(baseinfo.get('listingDate')),
-                    'broker': baseinfo.get('broker'),
-                    'snapshot_date': time.strftime('%Y-%m-%d')
-                })
-                print(f"\r✅ {stock_code}: {baseinfo.get('name', 'Unknown')[:40]}")
+        if error:
+            print(f"\r❌ {stock_code}: Error - {error}")
+            continue
 
-            time.sleep(1)  # Be polite
+        if baseinfo and baseinfo.get('stockCode'):
+            results.append(company_row(baseinfo))
+            print(f"\r✅ {stock_code}: {baseinfo.get('name', 'Unknown')[:40]}")
 
             if limit and len(results) >= limit:
                 break
 
-        except Exception as e:
-            print(f"\r❌ {stock_code}: Error - {e}")
-            continue
+    results.sort(key=lambda row: row['issuer_code'])
 
     print(f"\n{'=' * 60}")
     print(f"✅ Collected {len(results)} companies")
@@ -65,5 +53,8 @@ def collect_all_companies(limit=None):
 
 
 if __name__ == '__main__':
+    # Usage: bse_scrapper.py [limit] [workers] [requests_per_second]
     limit = int(sys.argv[1]) if len(sys.argv) > 1 else None
-    collect_all_companies(limit)
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    collect_all_companies(limit, workers, rate)
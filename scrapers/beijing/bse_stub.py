@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Local bseinfo.net stub
+Serves listedcompany.html and recorded-style detailCompany.do JSONP so the BSE
+collector can be benchmarked and tuned without touching the real site
+"""
+import sys
+import copy
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+try:
+    from .test_bse_spider import strip_jsonp
+except ImportError:  # run as a script from scrapers/beijing
+    from test_bse_spider import strip_jsonp
+
+
+# Shape of a real detailCompany.do response (values are placeholders)
+SAMPLE_COMPANY = {
+    "baseinfo": {
+        "stockCode": "920001",
+        "name": "北京示例科技股份有限公司",
+        "industry": "软件和信息技术服务业",
+        "totalStockEquity": "120000000",
+        "publishingDate": "20080515",
+        "area": "北京市海淀区",
+        "ISIN": "CNE100000001",
+        "listingDate": "20211115",
+        "broker": "示例证券",
+    },
+    "topTenHolders": [
+        {"gdmc": "示例控股有限公司", "cgsl": "45000000", "cgbl": "37.50", "jzrq": "20250630"},
+        {"gdmc": "张三", "cgsl": "12000000", "cgbl": "10.00", "jzrq": "20250630"},
+    ],
+}
+SAMPLE_CAPITAL = {"data": [{"zgb": "120000000", "wxsgs": "80000000", "xsgs": "40000000", "bdrq": "20250101"}]}
+
+LANDING_HTML = b"<!DOCTYPE html><html><head><title>listed companies</title></head><body></body></html>"
+SESSION_COOKIE = "BSE_SESSION"
+
+
+class BSEStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this Nagle adds ~40 ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        server.count(url.path)
+
+        if url.path == "/__stats":
+            return self.send_body(200, json.dumps(server.stats).encode(), "application/json")
+
+        if server.latency or server.jitter:
+            time.sleep(server.latency + server.random().uniform(0, server.jitter))
+
+        if url.path.endswith("listedcompany.html"):
+            return self.send_body(200, LANDING_HTML, "text/html; charset=utf-8",
+                                  {"Set-Cookie": f"{SESSION_COOKIE}=stub; Path=/"})
+
+        if server.require_cookie and SESSION_COOKIE not in self.headers.get("Cookie", ""):
+            return self.send_body(302, b"", "text/html", {"Location": "/nq/listedcompany.html"})
+        if server.random().random() < server.error_rate:
+            return self.send_body(503, b"Service Unavailable", "text/plain")
+
+        code = (params.get("zqdm") or [""])[0]
+        callback = (params.get("callback") or ["callback"])[0]
+        payload = server.payload(url.path, code)
+        if payload is None:
+            return self.send_body(404, b"", "text/plain")
+
+        body = f"{callback}({json.dumps(payload, ensure_ascii=False)})".encode("utf-8")
+        return self.send_body(200, body, "text/javascript; charset=utf-8")
+
+    def send_body(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class BSEStubServer(ThreadingHTTPServer):
+    """
+    Threaded stub with tunable behaviour:
+      latency/jitter  seconds added to every response (latency + uniform(0, jitter))
+      error_rate      share of detail requests answered with HTTP 503
+      empty_ratio     share of codes with no company (fixed per code and seed)
+      fixture         recorded detailCompany.do body (JSON or JSONP) to serve
+                      instead of SAMPLE_COMPANY; stockCode is rewritten per code
+    """
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency=0.05, jitter=0.0, error_rate=0.0,
+                 empty_ratio=0.3, fixture=None, require_cookie=True, seed=0):
+        super().__init__(address, BSEStubHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.empty_ratio = empty_ratio
+        self.require_cookie = require_cookie
+        self.seed = seed
+        self.company = SAMPLE_COMPANY
+        if fixture:
+            with open(fixture, encoding="utf-8") as f:
+                text = f.read()
+            try:
+                self.company = json.loads(text)
+            except ValueError:
+                self.company = strip_jsonp(text)
+
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def random(self):
+        # One generator per handler thread; random.Random is not shared safely
+        rng = getattr(self._local, "rng", None)
+        if rng is None:
+            rng = self._local.rng = random.Random()
+        return rng
+
+    def count(self, path):
+        with self._stats_lock:
+            self.stats[path] = self.stats.get(path, 0) + 1
+
+    def is_empty(self, code):
+        return random.Random(f"{self.seed}:{code}").random() < self.empty_ratio
+
+    def payload(self, path, code):
+        if path.endswith("detailCompany.do"):
+            if self.is_empty(code):
+                return {"baseinfo": {}}
+            company = copy.deepcopy(self.company)
+            company.setdefault("baseinfo", {})["stockCode"] = code
+            return company
+        if path.endswith("getTopTenHolders.do"):
+            return self.company.get("topTenHolders", [])
+        if path.endswith("getGbjg.do"):
+            return SAMPLE_CAPITAL
+        return None
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local bseinfo.net stub for offline benchmarks')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds per response (default: 0.05)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra uniform random seconds (default: 0)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of HTTP 503 answers (default: 0)')
+    parser.add_argument('--empty-ratio', type=float, default=0.3, help='Share of codes without a company (default: 0.3)')
+    parser.add_argument('--fixture', help='Recorded detailCompany.do response (JSON or JSONP)')
+    parser.add_argument('--no-cookie-check', action='store_true', help='Serve detail calls without a session cookie')
+    args = parser.parse_args()
+
+    server = BSEStubServer((args.host, args.port), latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, empty_ratio=args.empty_ratio,
+                           fixture=args.fixture, require_cookie=not args.no_cookie_check)
+    print(f"🧪 BSE stub serving on {server.url} (stats at {server.url}/__stats)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+BSE code universe
+Builds the list of live BSE stock codes so collection only fetches real companies
+"""
+import os
+import csv
+import json
+import datetime
+from pathlib import Path
+from urllib.request import Request, urlopen
+
+try:
+    from scrapers.cninfo.utils.exchange import map_exchange_by_code
+except ImportError:  # scrapers/ itself is on sys.path (run_beijing.py)
+    from cninfo.utils.exchange import map_exchange_by_code
+
+try:
+    from .test_bse_spider import strip_jsonp
+    from .bse_collector import BSE_CODE_RANGE
+except ImportError:  # run as a script from scrapers/beijing
+    from test_bse_spider import strip_jsonp
+    from bse_collector import BSE_CODE_RANGE
+
+
+CNINFO_UNIVERSE_URL = ("https://www.cninfo.com.cn/data/yellowpages/"
+                       "getYellowpageStockList?type=cn&pagenum=-1&keyword=&Sortcolumn=SECCODE")
+
+
+def bse_codes_from_rows(rows, code_field):
+    """Keep the codes map_exchange_by_code places on BSE, sorted and de-duplicated."""
+    codes = set()
+    for row in rows:
+        code = str(row.get(code_field) or "").strip().zfill(6)
+        if map_exchange_by_code(code)[0] == "BSE":
+            codes.add(code)
+    return sorted(codes)
+
+
+def load_snapshot_codes(snapshot_dir=None, max_age_days=7):
+    """
+    BSE codes from the newest cn_securities.csv a CNINFO run exported into
+    <SNAPSHOT_DIR>/<YYYY-MM-DD>/, if one exists and is recent enough.
+    """
+    base = Path(snapshot_dir or os.environ.get("SNAPSHOT_DIR", "10_snapshots"))
+    if not base.is_dir():
+        return []
+
+    cutoff = datetime.date.today() - datetime.timedelta(days=max_age_days)
+    for day_dir in sorted(base.iterdir(), reverse=True):
+        try:
+            day = datetime.date.fromisoformat(day_dir.name)
+        except ValueError:
+            continue
+        if day < cutoff:
+            break
+
+        path = day_dir / "cn_securities.csv"
+        if path.exists():
+            with open(path, newline='', encoding='utf-8') as f:
+                return bse_codes_from_rows(csv.DictReader(f), "stock_code")
+
+    return []
+
+
+def fetch_cninfo_codes(timeout=30):
+    """BSE codes from the live CNINFO yellowpages universe."""
+    req = Request(CNINFO_UNIVERSE_URL, headers={
+        'User-Agent': ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+                       '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'),
+        'Accept': 'application/json, text/javascript, */*; q=0.01',
+        'Referer': 'https://www.cninfo.com.cn/',
+        'X-Requested-With': 'XMLHttpRequest',
+    })
+    with urlopen(req, timeout=timeout) as response:
+        text = response.read().decode('utf-8', errors='replace')
+
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = strip_jsonp(text)
+
+    rows = data.get("records") if isinstance(data, dict) else data
+    return bse_codes_from_rows(rows or [], "SECCODE")
+
+
+def load_bse_codes(seed='universe'):
+    """
+    Return (codes, source) for a collection run.
+
+    With seed='universe' the codes come from the latest local CNINFO snapshot,
+    then the live CNINFO yellowpages list; range probing over BSE_CODE_RANGE
+    is used only when neither source yields any BSE code.
+    """
+    if seed == 'universe':
+        codes = load_snapshot_codes()
+        if codes:
+            return codes, "CNINFO snapshot"
+
+        try:
+            codes = fetch_cninfo_codes()
+        except Exception as e:
+            print(f"⚠️  CNINFO universe unavailable ({type(e).__name__}: {e})")
+            codes = []
+        if codes:
+            return codes, "CNINFO yellowpages"
+
+        print("⚠️  No BSE codes in the universe source, falling back to range probing")
+
+    return [str(code) for code in BSE_CODE_RANGE], "range probe"
@@ -0,0 +1,18 @@
+import scrapy
+
+
+class BSECompanyItem(scrapy.Item):
+    """BSE company profile from detailCompany.do (same columns as beijing_companies_*.csv)"""
+    issuer_code = scrapy.Field()
+    company_name_ch = scrapy.Field()
+    company_name_en = scrapy.Field()
+    industry_csic = scrapy.Field()
+    registered_capital = scrapy.Field()
+    established_date = scrapy.Field()
+    registered_address = scrapy.Field()
+    disclosure_lang = scrapy.Field()
+    isin = scrapy.Field()
+    listing_date = scrapy.Field()
+    broker = scrapy.Field()
+    evidence_url = scrapy.Field()
+    snapshot_date = scrapy.Field()
@@ -0,0 +1 @@
+"""BSE spiders"""
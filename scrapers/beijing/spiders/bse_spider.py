@@ -0,0 +1,160 @@
+import json
+import time
+import scrapy
+from scrapy.exceptions import CloseSpider
+
+from ..items import BSECompanyItem
+from ..bse_client import REJECT_STATUSES, USER_AGENT
+from ..bse_collector import BSE_CODE_RANGE, company_row
+from ..bse_universe import CNINFO_UNIVERSE_URL, bse_codes_from_rows, load_snapshot_codes
+from ..test_bse_spider import strip_jsonp
+
+
+class BSECompaniesSpider(scrapy.Spider):
+    """
+    Collects BSE company profiles from the bseinfo.net detailCompany.do XHR
+    and runs them through the CNINFO pipeline chain (normalization, dedupe,
+    QA, snapshot export).
+    Produces: 10_snapshots/<date>/bse_companies.csv
+
+    Arguments:
+      -a codes=920001,920002   fetch only these codes
+      -a seed=universe|range   CNINFO universe (default) or blind range probing
+      -a limit=10              stop after this many companies
+    """
+    name = "bse_companies"
+    allowed_domains = ["bseinfo.net", "www.bseinfo.net", "cninfo.com.cn", "www.cninfo.com.cn"]
+
+    LANDING_URL = "https://www.bseinfo.net/nq/listedcompany.html"
+    DETAIL_URL = "https://www.bseinfo.net/nqhqController/detailCompany.do"
+
+    custom_settings = {
+        # bseinfo.net ties detailCompany.do to the listedcompany.html session cookie
+        "COOKIES_ENABLED": True,
+        # 302 means "no session / anti-bot", not a page to follow
+        "REDIRECT_ENABLED": False,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 8,
+        "DOWNLOAD_DELAY": 0.25,
+        "AUTOTHROTTLE_TARGET_CONCURRENCY": 4.0,
+        "RETRY_ENABLED": True,
+        "RETRY_TIMES": 3,
+        # CNINFO's header middleware would stamp cninfo Origin/Referer on BSE calls
+        "DOWNLOADER_MIDDLEWARES": {},
+        "DEFAULT_REQUEST_HEADERS": {
+            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+            "User-Agent": USER_AGENT,
+        },
+    }
+
+    def __init__(self, codes=None, seed="universe", limit=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.codes = [c.strip() for c in codes.split(",") if c.strip()] if codes else None
+        self.seed = seed
+        self.limit = int(limit or 0)
+        self.collected = 0
+
+    async def start(self):
+        for r in self.start_requests():
+            yield r
+
+    def start_requests(self):
+        # Visit the landing page once; CookiesMiddleware keeps the session for every detail call
+        yield self.landing_request()
+
+    def landing_request(self, retry_code=None):
+        return scrapy.Request(
+            self.LANDING_URL,
+            callback=self.parse_landing,
+            headers={"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"},
+            meta={"retry_code": retry_code, "handle_httpstatus_all": True},
+            dont_filter=True,
+        )
+
+    def parse_landing(self, response):
+        retry_code = response.meta.get("retry_code")
+        if retry_code:
+            # Session refreshed after a rejection: retry that code once
+            yield self.detail_request(retry_code, retried=True)
+            return
+
+        if self.codes:
+            yield from self.schedule(self.codes, "command line")
+        elif self.seed == "universe":
+            codes = load_snapshot_codes()
+            if codes:
+                yield from self.schedule(codes, "CNINFO snapshot")
+            else:
+                yield scrapy.Request(
+                    CNINFO_UNIVERSE_URL,
+                    callback=self.parse_universe,
+                    errback=self.universe_failed,
+                    headers={"Referer": "https://www.cninfo.com.cn/", "X-Requested-With": "XMLHttpRequest"},
+                    dont_filter=True,
+                )
+        else:
+            yield from self.schedule([str(c) for c in BSE_CODE_RANGE], "range probe")
+
+    def parse_universe(self, response):
+        try:
+            data = json.loads(response.text)
+        except ValueError:
+            data = strip_jsonp(response.text)
+        rows = data.get("records") if isinstance(data, dict) else data
+        codes = bse_codes_from_rows(rows or [], "SECCODE")
+
+        if codes:
+            yield from self.schedule(codes, "CNINFO yellowpages")
+        else:
+            self.logger.warning("No BSE codes in CNINFO universe; falling back to range probing")
+            yield from self.schedule([str(c) for c in BSE_CODE_RANGE], "range probe")
+
+    def universe_failed(self, failure):
+        self.logger.warning("CNINFO universe unavailable (%s); falling back to range probing", failure.value)
+        yield from self.schedule([str(c) for c in BSE_CODE_RANGE], "range probe")
+
+    def schedule(self, codes, source):
+        self.logger.info("Scheduling %d BSE codes (source: %s)", len(codes), source)
+        for code in codes:
+            yield self.detail_request(code)
+
+    def detail_request(self, code, retried=False):
+        url = (f"{self.DETAIL_URL}?callback=jQuery371008590243684555687_1762466533461"
+               f"&zqdm={code}&xxfcbj=2&_={int(time.time() * 1000)}")
+        return scrapy.Request(
+            url,
+            callback=self.parse_company,
+            headers={
+                "Accept": "application/json, text/javascript, */*; q=0.01",
+                "Referer": self.LANDING_URL,
+                "X-Requested-With": "XMLHttpRequest",
+            },
+            meta={"stock_code": code, "evidence": url, "retried": retried,
+                  "handle_httpstatus_list": list(REJECT_STATUSES)},
+            dont_filter=True,
+        )
+
+    def parse_company(self, response):
+        code = response.meta["stock_code"]
+
+        if response.status in REJECT_STATUSES or response.text.lstrip().startswith("<"):
+            if response.meta.get("retried"):
+                self.logger.warning("BSE %s still rejected (status %s) after session refresh", code, response.status)
+            else:
+                self.logger.info("BSE %s rejected (status %s); refreshing session", code, response.status)
+                yield self.landing_request(retry_code=code)
+            return
+
+        data = strip_jsonp(response.text)
+        baseinfo = data.get("baseinfo") if isinstance(data, dict) else None
+        if not isinstance(baseinfo, dict) or not baseinfo.get("stockCode"):
+            self.logger.debug("No company at BSE code %s", code)
+            return
+
+        item = BSECompanyItem(company_row(baseinfo))
+        item["evidence_url"] = response.meta["evidence"]
+        item["snapshot_date"] = self.settings.get("SNAPSHOT_DATE")
+        yield item
+
+        self.collected += 1
+        if self.limit and self.collected >= self.limit:
+            raise CloseSpider(f"limit of {self.limit} companies reached")
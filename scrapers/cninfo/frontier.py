@@ -0,0 +1,88 @@
+
+from collections import deque
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider, NotConfigured
+
+
+class Frontier:
+    """
+    Flow-controlled request generation. Spiders hand lazy request iterators to
+    feed() instead of yielding every per-code request up front; the frontier
+    pulls from them only while the scheduler queue plus in-flight downloads is
+    below FRONTIER_LOW_WATERMARK, topping up to FRONTIER_HIGH_WATERMARK. It
+    refills whenever a request leaves the downloader and when the spider goes
+    idle, so the scheduler holds a bounded number of requests whatever the
+    universe size.
+
+    Requests pulled here go straight to the engine, past the spider middlewares,
+    so the iterators should yield plain requests only.
+    """
+
+    def __init__(self, crawler, low, high):
+        self.crawler = crawler
+        self.low = low
+        self.high = max(high, low)
+        self.sources = deque()
+        self.stats = crawler.stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        s = crawler.settings
+        if not s.getbool("FRONTIER_ENABLED"):
+            raise NotConfigured
+        ext = cls(crawler, s.getint("FRONTIER_LOW_WATERMARK"), s.getint("FRONTIER_HIGH_WATERMARK"))
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.refill, signal=signals.request_left_downloader)
+        crawler.signals.connect(ext.spider_idle, signal=signals.spider_idle)
+        return ext
+
+    def spider_opened(self, spider):
+        spider.frontier = self
+
+    def add(self, requests):
+        self.sources.append(iter(requests))
+        self.refill()
+
+    def queued(self):
+        engine = self.crawler.engine
+        scheduler = getattr(engine, "scheduler", None)
+        waiting = len(scheduler) if scheduler is not None and hasattr(scheduler, "__len__") else 0
+        return waiting + len(engine.downloader.active)
+
+    def refill(self, *args, **kwargs):
+        queued = self.queued()
+        if not self.sources or queued >= self.low:
+            return
+        engine = self.crawler.engine
+        while self.sources and queued < self.high:
+            try:
+                request = next(self.sources[0])
+            except StopIteration:
+                self.sources.popleft()
+                continue
+            except Exception:
+                self.crawler.spider.logger.exception("Frontier source failed; dropping it")
+                self.sources.popleft()
+                continue
+            engine.crawl(request)
+            queued += 1
+            self.stats.inc_value("frontier/pulled")
+        self.stats.max_value("frontier/max_queued", queued)
+
+    def spider_idle(self, spider):
+        self.refill()
+        if self.sources:
+            raise DontCloseSpider
+
+
+def feed(spider, requests):
+    """
+    Hand a lazy request iterator to the spider's frontier; `yield from` the
+    result. Without a frontier (FRONTIER_ENABLED off, or a callback run outside
+    a crawl) the requests are yielded directly, as before.
+    """
+    frontier = getattr(spider, "frontier", None)
+    if frontier is None:
+        return requests
+    frontier.add(requests)
+    return ()
@@ -0,0 +1,72 @@
+
+import datetime, pickle, time
+from pathlib import Path
+from scrapy.extensions.httpcache import FilesystemCacheStorage
+from .utils.endpoints import endpoint_family
+
+# Periodic-report disclosure windows (month, last day): annual + Q1 by Apr 30,
+# interim by Aug 31, Q3 by Oct 31. Shareholder lists change inside these.
+DISCLOSURE_WINDOWS = ((1, 4, 30), (7, 8, 31), (10, 10, 31))
+
+
+def last_quarter_end(day):
+    """Most recent report period end (Mar 31 / Jun 30 / Sep 30 / Dec 31) on or before day."""
+    for month, last in ((12, 31), (9, 30), (6, 30), (3, 31)):
+        end = datetime.date(day.year, month, last)
+        if end <= day:
+            return end
+    return datetime.date(day.year - 1, 12, 31)
+
+
+def in_disclosure_window(day):
+    for first_month, last_month, last_day in DISCLOSURE_WINDOWS:
+        if datetime.date(day.year, first_month, 1) <= day <= datetime.date(day.year, last_month, last_day):
+            return True
+    return False
+
+
+def report_period_expired(stored_at, now, window_ttl):
+    """
+    Shareholder data follows report periods: an entry expires once a new
+    period has ended since it was stored, and while that period's reports
+    are still being published it is only trusted for `window_ttl` seconds.
+    """
+    stored_day = datetime.date.fromtimestamp(stored_at)
+    today = datetime.date.fromtimestamp(now)
+    if last_quarter_end(today) > last_quarter_end(stored_day):
+        return True
+    if in_disclosure_window(today):
+        return now - stored_at > window_ttl
+    return False
+
+
+class EndpointTTLCacheStorage(FilesystemCacheStorage):
+    """
+    Filesystem HTTP cache whose expiry depends on the endpoint family
+    (utils.endpoints.endpoint_family) instead of one global TTL.
+
+    HTTPCACHE_ENDPOINT_TTLS maps a family to seconds, 0 (never expires) or
+    "report_period"; families not listed use HTTPCACHE_EXPIRATION_SECS.
+    """
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.endpoint_ttls = settings.getdict("HTTPCACHE_ENDPOINT_TTLS")
+        self.report_window_ttl = settings.getint("HTTPCACHE_REPORT_WINDOW_TTL", 86400)
+
+    def is_expired(self, url, stored_at, now=None):
+        now = now or time.time()
+        ttl = self.endpoint_ttls.get(endpoint_family(url), self.expiration_secs)
+        if ttl == "report_period":
+            return report_period_expired(stored_at, now, self.report_window_ttl)
+        ttl = int(ttl)
+        return 0 < ttl < now - stored_at
+
+    def _read_meta(self, spider, request):
+        metapath = Path(self._get_request_path(spider, request)) / "pickled_meta"
+        if not metapath.exists():
+            return None  # not found
+        if self.is_expired(request.url, metapath.stat().st_mtime):
+            return None  # expired for this endpoint
+        with self._open(metapath, "rb") as f:
+            return pickle.load(f)
@@ -1,3 +1,9 @@
+import os, json, hashlib
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from .utils.endpoints import endpoint_family
+
+
 class UserAgentMiddleware:
     def process_request(self, request, spider):
         # A mainstream desktop UA helps avoid HTML shells.
@@ -11,3 +17,76 @@ class UserAgentMiddleware:
         request.headers.setdefault(b"Referer", b"https://www.cninfo.com.cn/")
         request.headers.setdefault(b"X-Requested-With", b"XMLHttpRequest")
         return None
+
+
+class UnchangedBodyMiddleware:
+    """
+    Spider middleware that skips callbacks for per-code responses whose body is
+    byte-identical to the last one seen for the same URL. Callbacks are
+    generators, so leaving their output unconsumed means the body is never
+    decoded and no item reaches the pipelines; an unchanged code costs one SHA-1.
+
+    Hashes live in <STATE_DIR>/content_hashes.json. A URL's hash is only
+    recorded once its callback output has been fully handed on, and the file
+    is written when the spider closes.
+    """
+
+    def __init__(self, path, families, stats):
+        self.path = path
+        self.families = set(families)
+        self.stats = stats
+        self.hashes = {}
+        self.dirty = False
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.hashes = json.load(f)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        s = crawler.settings
+        if not s.getbool("UNCHANGED_SKIP_ENABLED"):
+            raise NotConfigured
+        mw = cls(path=os.path.join(s.get("STATE_DIR"), "content_hashes.json"),
+                 families=s.getlist("UNCHANGED_SKIP_FAMILIES"), stats=crawler.stats)
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    def _digest(self, response):
+        if response.status != 200 or endpoint_family(response.url) not in self.families:
+            return None
+        return hashlib.sha1(response.body).hexdigest()
+
+    def _unchanged(self, response, digest):
+        if digest is not None and self.hashes.get(response.url) == digest:
+            self.stats.inc_value("unchanged/skipped")
+            return True
+        return False
+
+    def _record(self, response, digest):
+        if digest is not None:
+            self.hashes[response.url] = digest
+            self.dirty = True
+
+    def process_spider_output(self, response, result, spider=None):
+        digest = self._digest(response)
+        if self._unchanged(response, digest):
+            return
+        yield from result
+        self._record(response, digest)
+
+    async def process_spider_output_async(self, response, result, spider=None):
+        digest = self._digest(response)
+        if self._unchanged(response, digest):
+            return
+        async for r in result:
+            yield r
+        self._record(response, digest)
+
+    def spider_closed(self, spider):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.hashes, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
@@ -1,6 +1,10 @@
 import os, csv
 from itemadapter import ItemAdapter
 
+# Snapshot files open in this process, shared by every crawler that exports to
+# the same path (run_cninfo.py --in-process); closed when the last user closes
+_OPEN_FILES = {}
+
 
 class SnapshotExportPipeline:
     def __init__(self, base_dir, snapshot_date):
@@ -31,16 +35,21 @@ class SnapshotExportPipeline:
                 "CompanyDetailItem": "cn_company_details.csv",
                 "TopShareholderItem": "cn_top5_shareholders.csv",
                 "JoinedCompanySecurityItem": "cn_joined_company_security.csv",
+                "BSECompanyItem": "bse_companies.csv",
             }
             fname = mapping.get(clsname, f"{clsname}.csv")
 
         path = os.path.join(self.dir, fname)
         if path not in self.files:
-            self.files[path] = {
-                "fh": open(path, "w", newline="", encoding="utf-8"),
-                "writer": None,
-                "header": None
-            }
+            if path not in _OPEN_FILES:
+                _OPEN_FILES[path] = {
+                    "fh": open(path, "w", newline="", encoding="utf-8"),
+                    "writer": None,
+                    "header": None,
+                    "users": 0
+                }
+            _OPEN_FILES[path]["users"] += 1
+            self.files[path] = _OPEN_FILES[path]
 
         store = self.files[path]
         ad = ItemAdapter(item).asdict()
@@ -61,5 +70,11 @@ class SnapshotExportPipeline:
         return item
 
     def close_spider(self, spider):
-        for store in self.files.values():
-            store["fh"].close()
\ No newline at end of file
+        for path, store in self.files.items():
+            store["users"] -= 1
+            if store["users"] == 0:
+                store["fh"].close()
+                del _OPEN_FILES[path]
+            else:
+                store["fh"].flush()
+        self.files = {}
\ No newline at end of file
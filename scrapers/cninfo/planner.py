@@ -0,0 +1,65 @@
+
+from .spiders.universe_spider import UniverseSpider
+from .spiders.securities_spider import SecuritiesSpider
+from .spiders.enrichment_spider import EnrichmentSpider
+from .spiders.company_details import CompanyDetailsSpider
+from .utils.endpoints import PER_CODE_ENDPOINTS
+
+# output -> [(endpoint, extractor)]; extractors are the existing spider callbacks,
+# called with the planning spider as `self` (they only use settings/logger/meta)
+OUTPUTS = {
+    "companies": [("universe_cn", UniverseSpider.parse_cn_snapshot),
+                  ("universe_en", UniverseSpider.parse_en_snapshot)],
+    "securities": [("index_type2", SecuritiesSpider.parse_security_detail)],
+    "company_details": [("index_type2", CompanyDetailsSpider.parse_company_detail_type2)],
+    "company_profiles": [("index_type1", EnrichmentSpider.parse_company)],
+    "shareholders": [("shareholders", EnrichmentSpider.parse_shareholders)],
+}
+
+# What each standalone spider produces, so `outputs` can name spiders too
+SPIDER_OUTPUTS = {
+    "cninfo_universe": ["companies"],
+    "cninfo_securities": ["securities"],
+    "cninfo_enrichment": ["company_profiles", "shareholders"],
+    "cninfo_company_details": ["company_details"],
+}
+
+
+class CrawlPlan:
+    """
+    Minimal endpoint set for a set of requested outputs. Each endpoint is
+    requested once per code and its response is routed to every extractor
+    that needs it, e.g. getIndexData type=2 feeds both securities and
+    company_details.
+    """
+
+    def __init__(self, outputs=None):
+        names = []
+        for name in outputs or list(OUTPUTS):
+            names.extend(SPIDER_OUTPUTS.get(name, [name]))
+        unknown = [n for n in names if n not in OUTPUTS]
+        if unknown:
+            raise ValueError(f"Unknown outputs {unknown}; choose from {sorted(OUTPUTS) + sorted(SPIDER_OUTPUTS)}")
+
+        self.outputs = list(dict.fromkeys(names))
+        self.routes = {}
+        for name in self.outputs:
+            for endpoint, extractor in OUTPUTS[name]:
+                self.routes.setdefault(endpoint, [])
+                if extractor not in self.routes[endpoint]:
+                    self.routes[endpoint].append(extractor)
+
+    @property
+    def per_code_endpoints(self):
+        return [e for e in self.routes if e in PER_CODE_ENDPOINTS]
+
+    def extractors(self, endpoint):
+        return self.routes.get(endpoint, [])
+
+    def url(self, endpoint, scode):
+        return PER_CODE_ENDPOINTS[endpoint](scode)
+
+    def describe(self):
+        demand = sum(len(OUTPUTS[n]) for n in self.outputs)
+        return (f"outputs={','.join(self.outputs)} endpoints={','.join(self.routes)} "
+                f"({len(self.routes)} fetches serve {demand} extractor routes)")
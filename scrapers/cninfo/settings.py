@@ -1,6 +1,6 @@
 
 BOT_NAME = "cninfo_pipeline"
-SPIDER_MODULES = ["scrapers.cninfo.spiders"]
+SPIDER_MODULES = ["scrapers.cninfo.spiders", "scrapers.beijing.spiders"]
 NEWSPIDER_MODULE = "scrapers.cninfo.spiders"
 
 ROBOTSTXT_OBEY = False
@@ -27,6 +27,15 @@ DOWNLOADER_MIDDLEWARES = {
     "scrapers.cninfo.middlewares.UserAgentMiddleware": 400,
 }
 
+SPIDER_MIDDLEWARES = {
+    # Closest to the spider so unchanged responses never start their callback
+    "scrapers.cninfo.middlewares.UnchangedBodyMiddleware": 950,
+}
+
+EXTENSIONS = {
+    "scrapers.cninfo.frontier.Frontier": 500,
+}
+
 ITEM_PIPELINES = {
     "scrapers.cninfo.pipelines.normalization.NormalizationPipeline": 100,
     "scrapers.cninfo.pipelines.dedupe.DedupePipeline": 200,
@@ -38,3 +47,40 @@ import os, datetime
 SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "10_snapshots")
 SNAPSHOT_DATE = os.environ.get("SNAPSHOT_DATE", datetime.date.today().strftime("%Y-%m-%d"))
 STATE_DIR = os.environ.get("STATE_DIR", ".state")
+
+# The yellowpages universe is downloaded once per SNAPSHOT_DATE into STATE_DIR/universe/
+# and shared by every spider of that snapshot; set to force a new download
+UNIVERSE_REFRESH = os.environ.get("UNIVERSE_REFRESH", "0") == "1"
+
+# Rows per yellowpages page; a live download fetches the pages concurrently.
+# 0 = the whole list in one pagenum=-1 request.
+UNIVERSE_PAGE_SIZE = int(os.environ.get("UNIVERSE_PAGE_SIZE", "500"))
+
+# HTTP cache with a TTL per endpoint family (scrapers/cninfo/httpcache.py); reruns
+# are served from disk except entries that expired. HTTPCACHE_ENABLED=0 to bypass.
+HTTPCACHE_ENABLED = os.environ.get("HTTPCACHE_ENABLED", "1") == "1"
+HTTPCACHE_DIR = "httpcache"
+HTTPCACHE_STORAGE = "scrapers.cninfo.httpcache.EndpointTTLCacheStorage"
+# Redirects are anti-bot bounces (REDIRECT is off for bse_companies), never cache them
+HTTPCACHE_IGNORE_HTTP_CODES = [301, 302, 303, 307, 400, 403, 404, 408, 412, 429, 500, 502, 503, 504]
+HTTPCACHE_EXPIRATION_SECS = 86400  # families not listed below
+HTTPCACHE_ENDPOINT_TTLS = {
+    "universe": 86400,                # yellowpages list: daily
+    "index_type1": 7 * 86400,         # company profile: weekly
+    "index_type2": 7 * 86400,         # security detail: weekly
+    "shareholders": "report_period",  # new quarter-end, or daily during disclosure season
+}
+HTTPCACHE_REPORT_WINDOW_TTL = 86400
+
+# Skip callbacks (and pipelines) for per-code responses whose body has not changed
+# since the last run; hashes in STATE_DIR/content_hashes.json. UNCHANGED_SKIP=0 to
+# re-parse everything, e.g. for a full snapshot export.
+UNCHANGED_SKIP_ENABLED = os.environ.get("UNCHANGED_SKIP", "1") == "1"
+UNCHANGED_SKIP_FAMILIES = ["index_type1", "index_type2", "shareholders"]
+
+# Per-code requests are pulled from the spiders lazily (scrapers/cninfo/frontier.py):
+# topped up to the high watermark whenever queued + in-flight drops below the low
+# one. FRONTIER=0 schedules the whole universe up front.
+FRONTIER_ENABLED = os.environ.get("FRONTIER", "1") == "1"
+FRONTIER_LOW_WATERMARK = 32
+FRONTIER_HIGH_WATERMARK = 64
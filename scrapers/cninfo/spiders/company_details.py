@@ -5,6 +5,9 @@ import re
 import scrapy
 
 from ..items import CompanyDetailItem
+from ..utils.universe import universe_request, universe_rows, universe_next_pages
+from ..utils.endpoints import index_data_url
+from ..frontier import feed
 
 # Local JSONP stripper so this file is self-contained
 _JSONP_RE = re.compile(r"^[\s\r\n\t]*([$\w]+)\s*\((.*)\)\s*;?\s*$", re.S)
@@ -33,32 +36,35 @@ class CompanyDetailsSpider(scrapy.Spider):
     custom_settings = {
         "DOWNLOAD_DELAY": 0.5,  # be polite to the site
     }
+    scheduled = 0  # across universe pages
 
     # use start_requests for Scrapy <2.13 compatibility, still works on 2.13+
     def start_requests(self):
-        yp = ("https://www.cninfo.com.cn/data/yellowpages/"
-              "getYellowpageStockList?type=cn&pagenum=-1&keyword=&Sortcolumn=SECCODE")
-        yield scrapy.Request(yp, callback=self.parse_yellowpages, meta={"evidence": yp})
+        yield universe_request(self, "cn", callback=self.parse_yellowpages)
 
     def parse_yellowpages(self, response):
-        data = _strip_jsonp(response.text)
-        rows = data.get("records") if isinstance(data, dict) else (data if isinstance(data, list) else [])
+        yield from universe_next_pages(response)
+        rows = universe_rows(response)
         if not rows:
             self.logger.warning("Yellowpages list empty; first 200: %r", (response.text or "")[:200])
             return
+        yield from feed(self, self._detail_requests(rows))
 
+    def _detail_requests(self, rows):
         limit = int(getattr(self, "limit", 0) or 0)                 # e.g. -a limit=50
         only  = (getattr(self, "only", "") or "").strip()           # e.g. -a only=000008
 
         scheduled = 0
         for r in rows:
+            if limit and self.scheduled >= limit:
+                break
             scode = str(r.get("SECCODE") or r.get("seccode") or "").zfill(6)
             if not scode:
                 continue
             if only and scode != only:
                 continue
 
-            url = f"https://www.cninfo.com.cn/data/yellowpages/getIndexData?scode={scode}&type=2"
+            url = index_data_url(scode, 2)
             yield scrapy.Request(
                 url,
                 callback=self.parse_company_detail_type2,
@@ -66,8 +72,7 @@ class CompanyDetailsSpider(scrapy.Spider):
                 dont_filter=True,
             )
             scheduled += 1
-            if limit and scheduled >= limit:
-                break
+            self.scheduled += 1
 
         self.logger.info("Scheduled %d company detail (type=2) requests", scheduled)
 
@@ -2,95 +2,43 @@ import scrapy
 from ..items import CompanyDetailItem, TopShareholderItem
 from ..utils.jsonp import strip_jsonp
 from ..validators.schemas import ensure_percent, ensure_int, ensure_number
+from ..utils.universe import universe_request, universe_rows, universe_next_pages
+from ..utils.endpoints import index_data_url, shareholders_url
+from ..frontier import feed
 
 class EnrichmentSpider(scrapy.Spider):
     name = "cninfo_enrichment"
     allowed_domains = ["cninfo.com.cn", "www.cninfo.com.cn"]
+    scheduled = 0  # child requests, across universe pages
 
     async def start(self):
         for r in self.start_requests():
             yield r
 
     def start_requests(self):
-        yp = "https://www.cninfo.com.cn/data/yellowpages/getYellowpageStockList?type=cn&pagenum=-1&keyword=&Sortcolumn=SECCODE"
-        yield scrapy.Request(yp, callback=self.parse_yellowpages, meta={"evidence": yp})
+        yield universe_request(self, "cn", callback=self.parse_yellowpages)
 
     def parse_yellowpages(self, response):
-        import json
-        snapdate = self.settings.get("SNAPSHOT_DATE")
-        txt = response.text
-
-        # 1) Force JSON (this endpoint is returning pure JSON for you)
-        try:
-            j = json.loads(txt)
-        except Exception as e:
-            # Fallback to JSONP stripper only if JSON fails
-            from ..utils.jsonp import strip_jsonp
-            j = strip_jsonp(txt)
-
-        # 2) Choose the container deterministically and log shape
-        rows = []
-        top_keys = list(j.keys()) if isinstance(j, dict) else None
-        if isinstance(j, dict):
-            if "records" in j and isinstance(j["records"], list):
-                rows = j["records"]
-                container = "records"
-            elif "data" in j and isinstance(j["data"], list):
-                rows = j["data"]
-                container = "data"
-            else:
-                container = "unknown"
-        elif isinstance(j, list):
-            rows = j
-            container = "root_list"
-        else:
-            container = type(j).__name__
-
-        self.logger.info(
-            "Yellowpages shape: type=%s, keys=%s, picked=%s, rows=%s",
-            type(j).__name__,
-            top_keys[:8] if isinstance(top_keys, list) else top_keys,
-            container,
-            len(rows) if isinstance(rows, list) else "N/A"
-        )
+        # Projected universe rows (live download or this snapshot's cached copy)
+        yield from universe_next_pages(response)
+        rows = universe_rows(response)
+        self.logger.info("Yellowpages universe: %d rows", len(rows))
 
         if not rows:
-            self.logger.warning("Yellowpages list empty; first 200 chars: %r", txt[:200])
+            self.logger.warning("Yellowpages list empty; first 200 chars: %r", response.text[:200])
             return
 
-        # 3) Emit items (Universe: SecurityItem; Enrichment: schedule child requests)
-        # ---- Universe spider version ----
-        # from ..items import SecurityItem
-        # from ..utils.exchange import map_exchange_by_code
-        # for row in rows:
-        #     code = str(row.get("SECCODE") or row.get("seccode") or "").zfill(6)
-        #     if not code:
-        #         continue
-        #     exch, board = map_exchange_by_code(code)
-        #     item = SecurityItem()
-        #     item["issuer_code"] = row.get("ORGID") or row.get("ORGCODE") or row.get("SECID")
-        #     item["stock_code"] = code
-        #     item["exchange"] = exch
-        #     item["board"] = board
-        #     item["share_class"] = "B" if code.startswith("200") else "A"
-        #     item["status"] = "Active"
-        #     item["list_date"] = None
-        #     item["delist_date"] = None
-        #     item["isin"] = None
-        #     item["evidence_url"] = response.meta.get("evidence")
-        #     item["snapshot_date"] = snapdate
-        #     yield item
-
-        # ---- Enrichment spider version ----
-
         if isinstance(rows[0], dict):
             self.logger.info("YP first-row keys: %s", list(rows[0].keys())[:12])
+        yield from feed(self, self._child_requests(rows))
 
-
+    def _child_requests(self, rows):
         # Schedule per-company detail + shareholders
         scheduled = 0
         limit = int(getattr(self, "limit", 0)) or 0   # optional: -a limit=25
         for row in rows:
+            if limit and self.scheduled >= 2 * limit:
+                break
             scode = str(row.get("SECCODE") or row.get("seccode") or "").zfill(6)
             issuer_code = (
                 row.get("ORGID")
@@ -102,8 +50,8 @@ class EnrichmentSpider(scrapy.Spider):
             if not scode or scode == "000000":
                 continue
 
-            url_info = f"https://www.cninfo.com.cn/data/yellowpages/getIndexData?scode={scode}&type=1"
-            url_sh   = f"https://www.cninfo.com.cn/data/yellowpages/singleStockData?scode={scode}&sign=1&type=1&mergerMark=shareHoldersData"
+            url_info = index_data_url(scode, 1)
+            url_sh   = shareholders_url(scode)
             meta = {
                 "scode": scode,
                 "issuer_code": issuer_code,
@@ -112,8 +60,7 @@ class EnrichmentSpider(scrapy.Spider):
             yield scrapy.Request(url_info, callback=self.parse_company,      meta={**meta, "evidence": url_info}, dont_filter=True)
             yield scrapy.Request(url_sh,   callback=self.parse_shareholders, meta={**meta, "evidence": url_sh},   dont_filter=True)
             scheduled += 2
-            if limit and scheduled >= 2 * limit:
-                break
+            self.scheduled += 2
 
         self.logger.info("Scheduled %d child requests for %d stocks", scheduled, scheduled // 2 if scheduled else 0)
 
@@ -1,7 +1,7 @@
-import json
 import scrapy
 from ..items import JoinedCompanySecurityItem
 from ..utils.exchange import map_exchange_by_code, map_board_by_code
+from ..utils.universe import UNIVERSE_URLS, universe_request, universe_rows, universe_next_pages, universe_done
 
 
 class JoinedViewSpider(scrapy.Spider):
@@ -19,47 +19,28 @@ class JoinedViewSpider(scrapy.Spider):
         # Store CN and EN data for merging
         self.cn_data = {}  # key: issuer_code, value: row dict
         self.en_data = {}  # key: issuer_code, value: row dict
+        self.lists_done = set()  # "cn"/"en" once every page of that list is in
 
     async def start(self):
         for r in self.start_requests():
             yield r
 
     def start_requests(self):
-        # Get universe from yellowpages (has both company and security info)
-        yp_cn = ("https://www.cninfo.com.cn/data/yellowpages/"
-                 "getYellowpageStockList?type=cn&pagenum=-1&keyword=&Sortcolumn=SECCODE")
-        yp_en = ("https://www.cninfo.com.cn/data/yellowpages/"
-                 "getYellowpageStockList?type=en&pagenum=-1&keyword=&Sortcolumn=SECCODE")
-
-        # Use meta to track request order
-        yield scrapy.Request(yp_cn, callback=self.parse_cn,
-                             meta={"evidence_issuer": yp_cn, "lang": "cn"},
-                             dont_filter=True)
-        yield scrapy.Request(yp_en, callback=self.parse_en,
-                             meta={"evidence_issuer": yp_en, "lang": "en"},
-                             dont_filter=True)
+        # Get universe from yellowpages (has both company and security info), shared per snapshot
+        yield universe_request(self, "cn", callback=self.parse_cn,
+                               meta={"evidence_issuer": UNIVERSE_URLS["cn"], "lang": "cn"})
+        yield universe_request(self, "en", callback=self.parse_en,
+                               meta={"evidence_issuer": UNIVERSE_URLS["en"], "lang": "en"})
 
     def parse_cn(self, response):
-        """Parse CN list and store in memory"""
-        txt = response.text
-
-        try:
-            j = json.loads(txt)
-        except Exception:
-            from ..utils.jsonp import strip_jsonp
-            j = strip_jsonp(txt)
-
-        rows = []
-        if isinstance(j, dict):
-            rows = j.get("records") or j.get("data") or []
-        elif isinstance(j, list):
-            rows = j
+        """Parse CN list (or one page of it) and store in memory"""
+        yield from universe_next_pages(response)
+        rows = universe_rows(response)
 
         self.logger.info(f"CN data: Found {len(rows)} companies")
 
         if not rows:
-            self.logger.warning("CN list empty; first 200: %r", txt[:200])
-            return
+            self.logger.warning("CN list empty; first 200: %r", response.text[:200])
 
         for row in rows:
             stock_code = str(row.get("SECCODE") or row.get("seccode") or "").zfill(6)
@@ -78,28 +59,17 @@ class JoinedViewSpider(scrapy.Spider):
             }
 
         self.logger.info(f"Stored {len(self.cn_data)} CN records")
+        yield from self._list_done(response, "cn")
 
     def parse_en(self, response):
-        """Parse EN list, merge with CN data, and emit joined items"""
-        txt = response.text
-
-        try:
-            j = json.loads(txt)
-        except Exception:
-            from ..utils.jsonp import strip_jsonp
-            j = strip_jsonp(txt)
-
-        rows = []
-        if isinstance(j, dict):
-            rows = j.get("records") or j.get("data") or []
-        elif isinstance(j, list):
-            rows = j
+        """Parse EN list (or one page of it) and store in memory"""
+        yield from universe_next_pages(response)
+        rows = universe_rows(response)
 
         self.logger.info(f"EN data: Found {len(rows)} companies")
 
         if not rows:
-            self.logger.warning("EN list empty; first 200: %r", txt[:200])
-            return
+            self.logger.warning("EN list empty; first 200: %r", response.text[:200])
 
         # Store EN data
         for row in rows:
@@ -117,9 +87,15 @@ class JoinedViewSpider(scrapy.Spider):
             }
 
         self.logger.info(f"Stored {len(self.en_data)} EN records")
+        yield from self._list_done(response, "en")
 
-        # Now merge and emit all records
-        yield from self._merge_and_emit()
+    def _list_done(self, response, lang):
+        """Merge and emit once both lists have arrived in full, whichever finishes last"""
+        if not universe_done(response):
+            return
+        self.lists_done.add(lang)
+        if self.lists_done == {"cn", "en"}:
+            yield from self._merge_and_emit()
 
     def _merge_and_emit(self):
         """Merge CN and EN data, emit joined items"""
@@ -0,0 +1,83 @@
+import scrapy
+from ..planner import CrawlPlan
+from ..frontier import feed
+from ..utils.universe import universe_request, universe_rows, universe_next_pages
+
+
+class PlannedSpider(scrapy.Spider):
+    """
+    Runs several CNINFO outputs in one crawl, fetching every per-code URL once.
+    The CrawlPlan routes each response to all extractors that need it, so the
+    exported CSVs are the same as running the individual spiders.
+
+    Arguments:
+      -a outputs=securities,company_details   outputs or spider names (default: all)
+      -a limit=50                             stop scheduling after this many codes
+      -a only=000001                          a single code
+    """
+    name = "cninfo_planned"
+    allowed_domains = ["cninfo.com.cn", "www.cninfo.com.cn"]
+    custom_settings = {"DOWNLOAD_DELAY": 0.5}
+    scheduled = 0  # codes, across universe pages
+
+    def __init__(self, outputs=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.plan = CrawlPlan([o.strip() for o in outputs.split(",") if o.strip()] if outputs else None)
+
+    async def start(self):
+        for r in self.start_requests():
+            yield r
+
+    def start_requests(self):
+        self.logger.info("Crawl plan: %s", self.plan.describe())
+        # The CN universe is always needed: it carries the codes to schedule
+        # Same evidence URLs as UniverseSpider so the company CSVs match
+        yield universe_request(self, "cn", callback=self.parse_universe, meta={
+            "endpoint": "universe_cn",
+            "evidence": "https://www.cninfo.com.cn/data/yellowpages/getYellowpageStockList?type=cn"})
+        if self.plan.extractors("universe_en"):
+            yield universe_request(self, "en", callback=self.parse_endpoint, meta={
+                "endpoint": "universe_en",
+                "evidence": "https://www.cninfo.com.cn/data/yellowpages/getYellowpageStockList?type=en"})
+
+    def parse_endpoint(self, response):
+        yield from universe_next_pages(response)
+        for extractor in self.plan.extractors(response.meta["endpoint"]):
+            yield from extractor(self, response) or ()
+
+    def parse_universe(self, response):
+        yield from self.parse_endpoint(response)
+
+        endpoints = self.plan.per_code_endpoints
+        if not endpoints:
+            return
+        rows = universe_rows(response)
+        if not rows:
+            self.logger.warning("Yellowpages list empty; first 200: %r", response.text[:200])
+            return
+        yield from feed(self, self._code_requests(rows, endpoints))
+
+    def _code_requests(self, rows, endpoints):
+        limit = int(getattr(self, "limit", 0) or 0)
+        only = (getattr(self, "only", "") or "").strip()
+        scheduled = 0
+        for row in rows:
+            if limit and self.scheduled >= limit:
+                break
+            scode = str(row.get("SECCODE") or "").zfill(6)
+            if scode == "000000" or (only and scode != only):
+                continue
+
+            meta = {
+                "scode": scode,
+                "issuer_code": row.get("ORGID") or row.get("ORGCODE") or row.get("SECID") or scode,
+                "company_name_ch": row.get("SECNAME"),
+            }
+            for endpoint in endpoints:
+                url = self.plan.url(endpoint, scode)
+                yield scrapy.Request(url, callback=self.parse_endpoint,
+                                     meta={**meta, "endpoint": endpoint, "evidence": url}, dont_filter=True)
+            scheduled += 1
+            self.scheduled += 1
+
+        self.logger.info("Scheduled %d requests for %d codes", scheduled * len(endpoints), scheduled)
@@ -3,6 +3,9 @@ import scrapy
 from ..items import SecurityItem
 from ..utils.jsonp import strip_jsonp
 from ..utils.exchange import map_exchange_by_code, map_board_by_code
+from ..utils.universe import universe_request, universe_rows, universe_next_pages
+from ..utils.endpoints import index_data_url
+from ..frontier import feed
 
 class SecuritiesSpider(scrapy.Spider):
     """
@@ -12,40 +15,38 @@ class SecuritiesSpider(scrapy.Spider):
     name = "cninfo_securities"
     allowed_domains = ["cninfo.com.cn", "www.cninfo.com.cn"]
     custom_settings = {"DOWNLOAD_DELAY": 0.5}
+    scheduled = 0  # across universe pages
 
     async def start(self):
         for r in self.start_requests():
             yield r
 
     def start_requests(self):
-        # Universe list (records[]: includes SECCODE etc.)
-        yp = ("https://www.cninfo.com.cn/data/yellowpages/"
-              "getYellowpageStockList?type=cn&pagenum=-1&keyword=&Sortcolumn=SECCODE")
-        yield scrapy.Request(yp, callback=self.parse_yellowpages, meta={"evidence": yp})
+        # Universe list (records[]: includes SECCODE etc.), shared per snapshot
+        yield universe_request(self, "cn", callback=self.parse_yellowpages)
 
     def parse_yellowpages(self, response):
         """Enumerate all scodes, schedule per-security detail calls (type=2)."""
-        txt = response.text
-        try:
-            data = json.loads(txt)
-        except Exception:
-            data = strip_jsonp(txt)
-
-        rows = data.get("records") if isinstance(data, dict) else (data if isinstance(data, list) else [])
+        yield from universe_next_pages(response)
+        rows = universe_rows(response)
         if not rows:
-            self.logger.warning("Yellowpages list empty; first 200: %r", txt[:200])
+            self.logger.warning("Yellowpages list empty; first 200: %r", response.text[:200])
             return
+        yield from feed(self, self._detail_requests(rows))
 
+    def _detail_requests(self, rows):
         limit = int(getattr(self, "limit", 0)) or 0  # for quick tests: -a limit=50
         count = 0
 
         for r in rows:
+            if limit and self.scheduled >= limit:
+                break
             scode = str(r.get("SECCODE") or r.get("seccode") or "").zfill(6)
             if not scode:
                 continue
 
             # type=2 has the 'transaction / board' block you observed
-            url = f"https://www.cninfo.com.cn/data/yellowpages/getIndexData?scode={scode}&type=2"
+            url = index_data_url(scode, 2)
             meta = {
                 "scode": scode,
                 "evidence": url,
@@ -53,8 +54,7 @@ class SecuritiesSpider(scrapy.Spider):
             yield scrapy.Request(url, callback=self.parse_security_detail, meta=meta, dont_filter=True)
 
             count += 1
-            if limit and count >= limit:
-                break
+            self.scheduled += 1
 
         self.logger.info("Scheduled %d security detail requests", count)
 
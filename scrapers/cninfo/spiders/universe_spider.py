@@ -1,7 +1,7 @@
-import json
 import scrapy
 from ..items import IssuerItem
 from ..utils.exchange import map_exchange_by_code, map_board_by_code
+from ..utils.universe import universe_request, universe_rows, universe_next_pages
 
 
 class UniverseSpider(scrapy.Spider):
@@ -14,14 +14,14 @@ class UniverseSpider(scrapy.Spider):
 
     def start_requests(self):
         # CN snapshot - generates cn_companies_cn.csv
-        yield scrapy.Request(
-            "https://www.cninfo.com.cn/data/yellowpages/getYellowpageStockList?type=cn&pagenum=-1&keyword=&Sortcolumn=SECCODE",
+        yield universe_request(
+            self, "cn",
             callback=self.parse_cn_snapshot,
             meta={"evidence": "https://www.cninfo.com.cn/data/yellowpages/getYellowpageStockList?type=cn"}
         )
         # EN snapshot - generates cn_companies_en.csv
-        yield scrapy.Request(
-            "https://www.cninfo.com.cn/data/yellowpages/getYellowpageStockList?type=en&pagenum=-1&keyword=&Sortcolumn=SECCODE",
+        yield universe_request(
+            self, "en",
             callback=self.parse_en_snapshot,
             meta={"evidence": "https://www.cninfo.com.cn/data/yellowpages/getYellowpageStockList?type=en"}
         )
@@ -29,29 +29,13 @@ class UniverseSpider(scrapy.Spider):
     def parse_cn_snapshot(self, response):
         """Parse CN company list - outputs to cn_companies_cn.csv"""
         snapdate = self.settings.get("SNAPSHOT_DATE")
-        txt = response.text
-
-        # Parse JSON
-        try:
-            j = json.loads(txt)
-        except Exception:
-            from ..utils.jsonp import strip_jsonp
-            j = strip_jsonp(txt)
-
-        # Extract rows
-        rows = []
-        if isinstance(j, dict):
-            if isinstance(j.get("records"), list):
-                rows = j["records"]
-            elif isinstance(j.get("data"), list):
-                rows = j["data"]
-        elif isinstance(j, list):
-            rows = j
+        yield from universe_next_pages(response)
+        rows = universe_rows(response)
 
         self.logger.info(f"CN Snapshot: Found {len(rows)} companies")
 
         if not rows:
-            self.logger.warning("CN snapshot empty; first 200 chars: %r", txt[:200])
+            self.logger.warning("CN snapshot empty; first 200 chars: %r", response.text[:200])
             return
 
         # Emit IssuerItem for each company
@@ -82,29 +66,13 @@ class UniverseSpider(scrapy.Spider):
     def parse_en_snapshot(self, response):
         """Parse EN company list - outputs to cn_companies_en.csv"""
         snapdate = self.settings.get("SNAPSHOT_DATE")
-        txt = response.text
-
-        # Parse JSON
-        try:
-            j = json.loads(txt)
-        except Exception:
-            from ..utils.jsonp import strip_jsonp
-            j = strip_jsonp(txt)
-
-        # Extract rows
-        rows = []
-        if isinstance(j, dict):
-            if isinstance(j.get("records"), list):
-                rows = j["records"]
-            elif isinstance(j.get("data"), list):
-                rows = j["data"]
-        elif isinstance(j, list):
-            rows = j
+        yield from universe_next_pages(response)
+        rows = universe_rows(response)
 
         self.logger.info(f"EN Snapshot: Found {len(rows)} companies")
 
         if not rows:
-            self.logger.warning("EN snapshot empty; first 200 chars: %r", txt[:200])
+            self.logger.warning("EN snapshot empty; first 200 chars: %r", response.text[:200])
             return
 
         # Emit IssuerItem for each company (with _emit_en flag)
@@ -0,0 +1,38 @@
+
+from urllib.parse import urlsplit, parse_qs
+
+YELLOWPAGES = "https://www.cninfo.com.cn/data/yellowpages"
+
+
+def index_data_url(scode, type_):
+    """getIndexData: type=1 company profile, type=2 security/company detail blocks."""
+    return f"{YELLOWPAGES}/getIndexData?scode={scode}&type={type_}"
+
+
+def shareholders_url(scode):
+    return f"{YELLOWPAGES}/singleStockData?scode={scode}&sign=1&type=1&mergerMark=shareHoldersData"
+
+
+# Per-code endpoints by name; each URL is fetched at most once per code
+PER_CODE_ENDPOINTS = {
+    "index_type1": lambda scode: index_data_url(scode, 1),
+    "index_type2": lambda scode: index_data_url(scode, 2),
+    "shareholders": shareholders_url,
+}
+
+
+def endpoint_family(url):
+    """
+    Coarse endpoint name of a CNINFO URL: 'universe', 'index_type1',
+    'index_type2', 'shareholders', or the last path segment for anything else.
+    """
+    parts = urlsplit(url)
+    name = parts.path.rsplit("/", 1)[-1]
+    q = parse_qs(parts.query)
+    if name == "getYellowpageStockList":
+        return "universe"
+    if name == "getIndexData":
+        return f"index_type{(q.get('type') or ['?'])[0]}"
+    if name == "singleStockData" and "shareHoldersData" in (q.get("mergerMark") or [""])[0]:
+        return "shareholders"
+    return name or parts.netloc
@@ -9,7 +9,7 @@ def map_exchange_by_code(code: str):
     - SZSE 300xxx → ChiNext (创业板)
     - SZSE 000xxx → Main
     - SZSE 002xxx → SME (small/medium enterprise)
-    - BSE 43/83/87/88/89 → BSE主板
+    - BSE 43/83/87/88/89/920 → BSE主板
     """
     c = str(code).strip()
     if not c or not c.isdigit():
@@ -36,7 +36,9 @@ def map_exchange_by_code(code: str):
         return "SZSE", "ChiNext"  # 创业板
 
     # ----- Beijing Stock Exchange (BSE) -----
-    # BSE codes: 43xxxx, 83xxxx, 87xxxx, 88xxxx, 89xxxx
+    # BSE codes: 43xxxx, 83xxxx, 87xxxx, 88xxxx, 89xxxx, 920xxx (post-2024 codes)
+    if c.startswith("920"):
+        return "BSE", "BSE主板"
     if c.startswith(("430", "43")):
         return "BSE", "BSE主板"
     if c.startswith(("830", "831", "832", "833", "835", "836", "837", "838", "839", "83")):
@@ -60,7 +62,7 @@ def map_board_by_code(code: str, exchange: str = None) -> str:
     - SSE STAR: 688/689 → STAR
     - SZSE ChiNext: 300/301 → ChiNext
     - SZSE SME: 002 → SME (if we want to distinguish from Main)
-    - BSE: 43/83/87/88/89 → BSE主板
+    - BSE: 43/83/87/88/89/920 → BSE主板
     - Otherwise: Main
 
     Args:
@@ -86,7 +88,8 @@ def map_board_by_code(code: str, exchange: str = None) -> str:
     bse_prefixes = (
         "43", "830", "831", "832", "833", "835", "836", "837", "838", "839",
         "870", "871", "872", "873", "875", "876", "877", "878",
-        "880", "881", "882", "883", "884", "885", "886", "887", "888", "889"
+        "880", "881", "882", "883", "884", "885", "886", "887", "888", "889",
+        "920"
     )
     if c.startswith(bse_prefixes):
         return "BSE主板"
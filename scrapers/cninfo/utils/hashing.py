@@ -0,0 +1,7 @@
+
+import json, hashlib
+
+def stable_hash(obj) -> str:
+    """SHA-1 of the canonical JSON form of obj (sorted keys, so dict order never matters)."""
+    payload = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,18 @@
+
+import re, unicodedata
+
+_WS = re.compile(r"\s+")
+
+def normalize_company_name_cn(name: str):
+    """Trim/collapse whitespace and use full-width brackets, as CN registrations do."""
+    if not isinstance(name, str):
+        return name
+    s = _WS.sub(" ", name).strip()
+    return s.replace("(", "（").replace(")", "）")
+
+def normalize_company_name_en(name: str):
+    """Fold full-width characters to ASCII and trim/collapse whitespace."""
+    if not isinstance(name, str):
+        return name
+    s = unicodedata.normalize("NFKC", name)
+    return _WS.sub(" ", s).strip()
@@ -0,0 +1,199 @@
+
+import os, re, json, math, time
+from pathlib import Path
+import scrapy
+
+UNIVERSE_URLS = {
+    "cn": "https://www.cninfo.com.cn/data/yellowpages/getYellowpageStockList?type=cn&pagenum=-1&keyword=&Sortcolumn=SECCODE",
+    "en": "https://www.cninfo.com.cn/data/yellowpages/getYellowpageStockList?type=en&pagenum=-1&keyword=&Sortcolumn=SECCODE",
+}
+UNIVERSE_PAGE_URL = ("https://www.cninfo.com.cn/data/yellowpages/getYellowpageStockList"
+                     "?type={lang}&pagenum={page}&pagesize={size}&keyword=&Sortcolumn=SECCODE")
+
+# The only yellowpages columns any spider reads; everything else is dropped from the cache
+UNIVERSE_FIELDS = ("SECCODE", "SECNAME", "ORGNAME", "ORGID", "ORGCODE", "SECID", "ORGTYPE")
+
+# Meta Scrapy sets on a single download, not carried over to the next page
+PER_RESPONSE_META = ("download_latency", "download_slot", "retry_times", "depth")
+
+# Keys the paged list may report its size under
+TOTAL_KEYS = ("totalRecordNum", "totalRecords", "totalCount", "total")
+
+# Byte patterns for iter_projected_rows: the record array, one record with braces
+# inside its strings (the slow path), a projected non-null "key": value pair and
+# the total
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_ARRAY_RES = [re.compile(rb'"%s"\s*:\s*\[' % k) for k in (b"records", b"data")] + [
+    re.compile(rb'^(?:\xef\xbb\xbf)?\s*(?:[$\w]+\s*\()?\s*\[')]  # bare list, optionally JSONP
+_RECORD_RE = re.compile(rb'\{[^{}"]*(?:%s[^{}"]*)*\}' % _STRING)
+_PAIR_RE = re.compile(rb'"(?:%s)"\s*:\s*(?:%s|-?[0-9][0-9.eE+-]*|true|false)' % (
+    b"|".join(f.encode() for f in UNIVERSE_FIELDS + tuple(f.lower() for f in UNIVERSE_FIELDS)), _STRING))
+_UPPER_FIELDS = frozenset(UNIVERSE_FIELDS)
+_raw_decode = json.JSONDecoder().raw_decode
+_TOTAL_RE = re.compile(rb'"(?:%s)"\s*:\s*"?([0-9]+)' % b"|".join(k.encode() for k in TOTAL_KEYS))
+
+
+def universe_cache_path(settings, lang):
+    """<STATE_DIR>/universe/<SNAPSHOT_DATE>/<lang>.json"""
+    return Path(settings.get("STATE_DIR") or ".state") / "universe" / settings.get("SNAPSHOT_DATE") / f"{lang}.json"
+
+
+def iter_projected_rows(body):
+    """
+    Projected rows of a yellowpages payload (JSON, JSONP or our cache file),
+    one at a time, straight from the response bytes: only UNIVERSE_FIELDS
+    values are decoded, so no dict is built for the other columns. Records
+    are flat objects in "records", "data" or a bare list; lower-case field
+    spellings some payloads use are folded to upper case.
+    """
+    for array_re in _ARRAY_RES:
+        m = array_re.search(body)
+        if m:
+            break
+    else:
+        return
+    pos = m.end()
+    while True:
+        # bytes.find is far cheaper than a regex over every byte of the list
+        start = body.find(b"{", pos)
+        if start < 0 or body[pos:start].strip(b", \t\r\n"):
+            return  # end of the array
+        end = body.find(b"}", start) + 1
+        if (end == 0 or body.find(b"{", start + 1, end) >= 0
+                or (body.count(b'"', start, end) - body.count(b'\\"', start, end)) % 2):
+            # A brace inside a string value: match the record properly
+            m = _RECORD_RE.match(body, start)
+            if m is None:
+                return
+            end = m.end()
+        pos = end
+        # Only the projected pairs are decoded, as one small object
+        row = _raw_decode((b"{%s}" % b",".join(_PAIR_RE.findall(body, start, end))).decode())[0]
+        if not _UPPER_FIELDS.issuperset(row):
+            upper = {k: v for k, v in row.items() if k.isupper()}
+            row = {k.upper(): v for k, v in row.items() if k.upper() not in upper}
+            row.update(upper)  # the upper-case spelling wins
+        yield row
+
+
+def _page_total(body):
+    m = _TOTAL_RE.search(body)
+    return int(m.group(1)) if m else None
+
+
+def universe_request(spider, lang, callback, meta=None, **kwargs):
+    """
+    Request for the CN or EN yellowpages universe. Within one SNAPSHOT_DATE the
+    list is downloaded once and later spiders read the compact local copy via
+    file://; UNIVERSE_REFRESH=1 (or -a refresh_universe=1) forces a new download.
+
+    With UNIVERSE_PAGE_SIZE > 0 a live download is paged: the callback runs
+    once per page, should start with `yield from universe_next_pages(response)`
+    and gets that page's rows from universe_rows(response). universe_done(response)
+    tells when every page has arrived; the cache is written at that point.
+    """
+    path = universe_cache_path(spider.settings, lang)
+    refresh = spider.settings.getbool("UNIVERSE_REFRESH") or str(getattr(spider, "refresh_universe", "")).lower() in ("1", "true", "yes")
+    meta = dict(meta or {})
+    meta.setdefault("evidence", UNIVERSE_URLS[lang])
+
+    if path.exists() and not refresh:
+        spider.logger.info("Universe (%s) from snapshot cache %s", lang, path)
+        meta["allow_offsite"] = True
+        return scrapy.Request(path.resolve().as_uri(), callback=callback, meta=meta, dont_filter=True, **kwargs)
+
+    meta["universe_cache"] = str(path)
+    size = spider.settings.getint("UNIVERSE_PAGE_SIZE")
+    if not size:
+        return scrapy.Request(UNIVERSE_URLS[lang], callback=callback, meta=meta, dont_filter=True, **kwargs)
+
+    # Shared (by reference) by every page request of this download
+    meta["universe_state"] = {"lang": lang, "size": size, "pages": {}, "last_page": None, "done": False}
+    meta["universe_page"] = 1
+    kwargs.setdefault("priority", 10)  # finish the list ahead of the detail calls it feeds
+    return scrapy.Request(UNIVERSE_PAGE_URL.format(lang=lang, page=1, size=size),
+                          callback=callback, meta=meta, dont_filter=True, **kwargs)
+
+
+def _write_cache(cache, url, rows):
+    # Write-then-rename so a concurrent reader never sees half a file
+    os.makedirs(os.path.dirname(cache), exist_ok=True)
+    tmp = f"{cache}.{os.getpid()}.{id(rows)}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"url": url, "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "records": rows},
+                  f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, cache)
+
+
+def _record_page(response, rows):
+    state = response.meta["universe_state"]
+    page = response.meta["universe_page"]
+    state["pages"][page] = rows
+
+    if page == 1:
+        total = _page_total(response.body)
+        if len(rows) > state["size"]:
+            state["last_page"] = 1  # the server ignored paging and sent everything
+        elif total is not None and rows:
+            # Page length as served, in case it differs from the size asked for
+            state["last_page"] = max(1, math.ceil(total / len(rows)))
+    if state["last_page"] is None and len(rows) < state["size"]:
+        state["last_page"] = page  # short page without a total: the end
+
+    last = state["last_page"]
+    if last is not None and all(p in state["pages"] for p in range(1, last + 1)):
+        state["done"] = True
+        cache = response.meta.get("universe_cache")
+        every_row = [r for p in range(1, last + 1) for r in state["pages"][p]]
+        if cache and every_row:
+            _write_cache(cache, UNIVERSE_URLS[state["lang"]], every_row)
+        state["pages"] = {}
+
+
+def universe_rows(response):
+    """
+    Projected rows of a universe response (one page when paged). A live
+    download is written to the snapshot cache once it is complete.
+    """
+    if "universe_rows" in response.meta:
+        # Already parsed for another extractor of the same response
+        return response.meta["universe_rows"]
+    rows = list(iter_projected_rows(response.body))
+
+    if "universe_state" in response.meta:
+        _record_page(response, rows)
+    elif response.meta.get("universe_cache") and rows:
+        _write_cache(response.meta["universe_cache"], response.url, rows)
+    response.meta["universe_rows"] = rows
+    return rows
+
+
+def universe_next_pages(response):
+    """
+    Follow-up page requests for a paged universe response (same callback and
+    meta). Page 1 fans out to every remaining page at once when the list
+    reports its size; otherwise pages are followed one at a time. Yields
+    nothing for unpaged or cached lists, and only once per response.
+    """
+    state = response.meta.get("universe_state")
+    if state is None or response.meta.get("universe_followed"):
+        return
+    response.meta["universe_followed"] = True
+    universe_rows(response)
+
+    page = response.meta["universe_page"]
+    if state["last_page"] is not None:
+        pages = range(2, state["last_page"] + 1) if page == 1 else ()
+    else:
+        pages = (page + 1,)
+    for p in pages:
+        url = UNIVERSE_PAGE_URL.format(lang=state["lang"], page=p, size=state["size"])
+        meta = {k: v for k, v in response.meta.items()
+                if k not in PER_RESPONSE_META and (not k.startswith("universe_") or k in ("universe_state", "universe_cache"))}
+        yield response.request.replace(url=url, meta={**meta, "universe_page": p})
+
+
+def universe_done(response):
+    """True once every row of this universe download has been delivered."""
+    state = response.meta.get("universe_state")
+    return state is None or state["done"]
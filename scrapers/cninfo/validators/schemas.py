@@ -0,0 +1,28 @@
+
+def ensure_number(v):
+    """Parse numbers like 1,234.5 / '12.3%' / ' 7 '; None when not numeric."""
+    if v is None or isinstance(v, bool):
+        return None
+    if isinstance(v, (int, float)):
+        return v
+    s = str(v).strip().replace(",", "").rstrip("%")
+    if not s:
+        return None
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+def ensure_int(v):
+    n = ensure_number(v)
+    if n is None:
+        return None
+    try:
+        return int(n)
+    except (ValueError, OverflowError):
+        return None
+
+def ensure_percent(v):
+    """Holding ratios arrive as 12.34 or '12.34%'; both become 12.34."""
+    n = ensure_number(v)
+    return float(n) if n is not None else None